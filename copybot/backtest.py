@@ -0,0 +1,257 @@
+import csv
+import logging
+import time
+
+import numpy as np
+
+from utils import trade_rules
+from network.pair_graph import FEE_NUMERATOR, FEE_DENOMINATOR
+
+
+logger = logging.getLogger(__name__)
+
+
+TRANSFER_COLUMNS = ('leader', 'hash', 'blockNumber', 'from', 'to', 'contractAddress', 'value')
+RESERVE_COLUMNS = ('token', 'blockNumber', 'reserve_token', 'reserve_bnb')
+
+ADDRESS_COLUMNS = ('leader', 'hash', 'from', 'to', 'contractAddress', 'token')
+INT_COLUMNS = ('blockNumber',)
+
+# Reserve lookups are keyed on token_id * BLOCK_SHIFT + block
+BLOCK_SHIFT = 1 << 32
+
+
+def _load_columns(paths: list, columns: tuple) -> dict:
+    """
+    Bulk loads columns from .npz or .csv files (BscScan export layout plus a
+    'leader' column for transfers) and concatenates them
+    """
+    parts = {column: [] for column in columns}
+
+    for path in paths:
+        if path.endswith('.npz'):
+            with np.load(path, allow_pickle=False) as data:
+                for column in columns:
+                    parts[column].append(data[column])
+        else:
+            with open(path, newline='') as f:
+                rows = list(csv.DictReader(f))
+            for column in columns:
+                parts[column].append(np.array([row[column] for row in rows]))
+
+    data = {column: np.concatenate(values) if values else np.array([]) for column, values in parts.items()}
+
+    for column in columns:
+        if column in ADDRESS_COLUMNS:
+            data[column] = np.char.lower(data[column].astype(str))
+        elif column in INT_COLUMNS:
+            data[column] = data[column].astype(np.int64)
+        else:
+            # Token amounts overflow int64, float precision is plenty for PnL
+            data[column] = data[column].astype(np.float64)
+
+    return data
+
+
+def load_transfers(paths: list) -> dict:
+    return _load_columns(paths, TRANSFER_COLUMNS)
+
+
+def load_reserves(paths: list) -> dict:
+    return _load_columns(paths, RESERVE_COLUMNS)
+
+
+def amount_out(amount_in: np.ndarray, reserve_in: np.ndarray, reserve_out: np.ndarray) -> np.ndarray:
+    """
+    Vectorized constant product output amount, same formula as the router
+    """
+    amount_in_with_fee = amount_in * FEE_NUMERATOR
+
+    return amount_in_with_fee * reserve_out / (reserve_in * FEE_DENOMINATOR + amount_in_with_fee)
+
+
+class Backtest:
+    """
+    Replays leaders' historical token transfers through the same BUY/SELL
+    rules as BscTrades and simulates our copy fills against historical
+    token/WBNB pair reserves, delayed by a number of blocks. Like
+    aggregate_swaps, transfers are netted per transaction and token first,
+    so taxes and router hops don't produce extra signals.
+    """
+    def __init__(self, transfers: dict, reserves: dict, buy_amount_bnb: float = 0.01, latencies: tuple = (0, 1, 2, 5, 10)):
+        if not len(reserves['token']):
+            raise ValueError("Backtest requires historical pair reserves to simulate fills")
+
+        self.buy_amount = buy_amount_bnb * 10 ** 18
+        self.latencies = latencies
+
+        self.leaders, leader_id = np.unique(transfers['leader'], return_inverse=True)
+
+        count = len(transfers['contractAddress'])
+        tokens, token_id = np.unique(np.concatenate([transfers['contractAddress'], reserves['token']]), return_inverse=True)
+        _, hash_id = np.unique(transfers['hash'], return_inverse=True)
+
+        self.transfer_count = count
+
+        # One swap leg per (leader, transaction, token) the leader's balance changed in,
+        # addresses are already lowercase
+        net = trade_rules.leader_net_value(transfers['value'], transfers['from'], transfers['to'], transfers['leader'])
+        order = np.lexsort((token_id[:count], hash_id, leader_id))
+        changed = (np.diff(leader_id[order]) != 0) | (np.diff(hash_id[order]) != 0) | (np.diff(token_id[order]) != 0)
+        starts = np.flatnonzero(np.concatenate([[True], changed]))[:count]
+        net = np.add.reduceat(net[order], starts) if count else net
+
+        # lexsort is stable, so each leg starts at its first transfer
+        first = order[starts]
+        first, net = first[net != 0], net[net != 0]
+
+        self.row = first
+        self.leader_id = leader_id[first]
+        self.token_id = token_id[first]
+        self.block = transfers['blockNumber'][first]
+        self.value = np.abs(net)
+        self.is_buy = net > 0
+
+        reserve_token_id = token_id[count:]
+        order = np.lexsort((reserves['blockNumber'], reserve_token_id))
+        self.reserve_token_id = reserve_token_id[order]
+        self.reserve_keys = self.reserve_token_id * BLOCK_SHIFT + reserves['blockNumber'][order]
+        self.reserve_token = reserves['reserve_token'][order]
+        self.reserve_bnb = reserves['reserve_bnb'][order]
+
+    def signals(self) -> dict:
+        """
+        Runs the copy rules over all swap legs, grouped per (leader, token) in
+        block order. Returns one row per BUY/SELL we would have sent, each
+        tied to a position id and the first transfer of its swap leg.
+        """
+        order = np.lexsort((self.row, self.block, self.token_id, self.leader_id))
+
+        rows, is_sell, position = [], [], []
+        position_count = 0
+        group, open_value = None, None
+
+        for row, leader, token, is_buy, value in zip(order.tolist(), self.leader_id[order].tolist(), self.token_id[order].tolist(),
+                                                      self.is_buy[order].tolist(), self.value[order].tolist()):
+            # Open swaps only live within one (leader, token) group
+            if (leader, token) != group:
+                group, open_value = (leader, token), None
+
+            if is_buy and open_value is None and value > 0:
+                open_value = value
+                rows.append(row)
+                is_sell.append(False)
+                position.append(position_count)
+                position_count += 1
+
+            elif not is_buy and open_value is not None and trade_rules.meets_sell_threshold(value, open_value):
+                open_value = None
+                rows.append(row)
+                is_sell.append(True)
+                position.append(position_count - 1)
+
+        rows = np.array(rows, dtype=np.int64)
+
+        return {
+            'row': self.row[rows],
+            'is_sell': np.array(is_sell, dtype=bool),
+            'position': np.array(position, dtype=np.int64),
+            'position_count': position_count,
+            'leader_id': self.leader_id[rows],
+            'token_id': self.token_id[rows],
+            'block': self.block[rows],
+        }
+
+    def _reserves_at(self, token_id: np.ndarray, block: np.ndarray) -> tuple:
+        """
+        Latest reserve snapshot at or before block for each token
+        """
+        index = np.searchsorted(self.reserve_keys, token_id * BLOCK_SHIFT + block, side='right') - 1
+        valid = index >= 0
+        index = np.where(valid, index, 0)
+        valid &= self.reserve_token_id[index] == token_id
+
+        return self.reserve_token[index], self.reserve_bnb[index], valid
+
+    def simulate(self, signals: dict, latency: int) -> dict:
+        """
+        Fills every signal `latency` blocks after the leader's transfer.
+        Returns per-leader PnL in BNB for this latency.
+        """
+        reserve_token, reserve_bnb, valid = self._reserves_at(signals['token_id'], signals['block'] + latency)
+
+        buys = ~signals['is_sell']
+        sells = signals['is_sell']
+        count = signals['position_count']
+
+        position_leader = np.zeros(count, dtype=np.int64)
+        position_token = np.zeros(count, dtype=np.int64)
+        tokens_held = np.zeros(count)
+        bought = np.zeros(count, dtype=bool)
+
+        buy_position = signals['position'][buys]
+        position_leader[buy_position] = signals['leader_id'][buys]
+        position_token[buy_position] = signals['token_id'][buys]
+        bought[buy_position] = valid[buys]
+        tokens_held[buy_position] = np.where(valid[buys], amount_out(self.buy_amount, reserve_bnb[buys], reserve_token[buys]), 0)
+
+        bnb_out = np.zeros(count)
+        closed = np.zeros(count, dtype=bool)
+
+        sell_position = signals['position'][sells]
+        sell_filled = valid[sells] & bought[sell_position]
+        closed[sell_position] = sell_filled
+        bnb_out[sell_position] = np.where(sell_filled, amount_out(tokens_held[sell_position], reserve_token[sells], reserve_bnb[sells]), 0)
+
+        # Positions still open are marked at their token's latest reserves
+        still_open = bought & ~closed
+        last_index = np.searchsorted(self.reserve_keys, (position_token + 1) * BLOCK_SHIFT, side='left') - 1
+        last_index = np.clip(last_index, 0, None)
+        bnb_out = np.where(still_open, amount_out(tokens_held, self.reserve_token[last_index], self.reserve_bnb[last_index]), bnb_out)
+
+        pnl = np.where(bought, bnb_out - self.buy_amount, 0) / 10 ** 18
+        leader_count = len(self.leaders)
+
+        return {
+            'positions': np.bincount(position_leader[bought], minlength=leader_count),
+            'closed': np.bincount(position_leader[closed], minlength=leader_count),
+            'pnl_bnb': np.bincount(position_leader, weights=pnl, minlength=leader_count),
+        }
+
+    def run(self) -> list:
+        """
+        Returns one result row per (leader, latency), i.e. each leader's
+        latency-sensitivity curve
+        """
+        start = time.perf_counter()
+        signals = self.signals()
+        logger.info(f"Replayed {self.transfer_count} transfers into {len(signals['row'])} signals in {time.perf_counter() - start:.2f}s")
+
+        results = []
+        for latency in self.latencies:
+            simulated = self.simulate(signals, latency)
+
+            for leader_id, leader in enumerate(self.leaders):
+                positions = int(simulated['positions'][leader_id])
+                pnl = float(simulated['pnl_bnb'][leader_id])
+                invested = positions * self.buy_amount / 10 ** 18
+
+                results.append({
+                    'leader': leader,
+                    'latency_blocks': latency,
+                    'positions': positions,
+                    'closed': int(simulated['closed'][leader_id]),
+                    'pnl_bnb': pnl,
+                    'roi': pnl / invested if invested else 0.0,
+                })
+
+        logger.info(f"Backtest of {len(self.leaders)} leaders over {len(self.latencies)} latencies took {time.perf_counter() - start:.2f}s")
+
+        return results
+
+
+def write_results(results: list, path: str):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['leader', 'latency_blocks', 'positions', 'closed', 'pnl_bnb', 'roi'])
+        writer.writeheader()
+        writer.writerows(results)
@@ -0,0 +1,70 @@
+"""
+Benchmark of the backtesting engine on synthetic leader histories.
+
+Run from the copybot directory:
+
+    python benchmarks/bench_backtest.py [transfers] [leaders]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from backtest import Backtest
+
+
+def synthetic_data(transfer_count: int, leader_count: int, token_count: int = 5000, seed: int = 1):
+    rnd = np.random.default_rng(seed)
+
+    leaders = np.array([f"0x{i:040x}" for i in range(leader_count)])
+    tokens = np.array([f"0x{i + 10 ** 6:040x}" for i in range(token_count)])
+
+    leader = leaders[rnd.integers(0, leader_count, transfer_count)]
+    is_buy = rnd.random(transfer_count) < 0.5
+    pool = "0x10ed43c718714eb63d5aa57b78b54704e256024e"
+
+    transfers = {
+        'leader': leader,
+        'hash': np.char.add("0x", np.arange(transfer_count).astype(str)),
+        'blockNumber': rnd.integers(0, 10 ** 6, transfer_count).astype(np.int64),
+        'from': np.where(is_buy, pool, leader),
+        'to': np.where(is_buy, leader, pool),
+        'contractAddress': tokens[rnd.integers(0, token_count, transfer_count)],
+        'value': rnd.random(transfer_count) * 10 ** 21,
+    }
+
+    snapshots = token_count * 50
+    reserves = {
+        'token': np.repeat(tokens, 50),
+        'blockNumber': rnd.integers(0, 10 ** 6, snapshots).astype(np.int64),
+        'reserve_token': rnd.random(snapshots) * 10 ** 24 + 10 ** 22,
+        'reserve_bnb': rnd.random(snapshots) * 10 ** 21 + 10 ** 19,
+    }
+
+    return transfers, reserves
+
+
+if __name__ == "__main__":
+    transfer_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    leader_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    transfers, reserves = synthetic_data(transfer_count, leader_count)
+
+    start = time.perf_counter()
+    backtest = Backtest(transfers, reserves)
+    setup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    signals = backtest.signals()
+    replay = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for latency in backtest.latencies:
+        backtest.simulate(signals, latency)
+    simulate = time.perf_counter() - start
+
+    print(f"{transfer_count} transfers, {leader_count} leaders, {len(signals['row'])} signals")
+    print(f"setup {setup:.2f}s  replay {replay:.2f}s  simulate {len(backtest.latencies)} latencies {simulate:.2f}s")
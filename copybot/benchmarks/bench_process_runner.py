@@ -0,0 +1,103 @@
+"""
+Throughput of the multi-process run mode against the single-process mode.
+
+Watchers and executors are replaced by CPU-bound stand-ins (repeated
+sha256) for BscScan parsing and for signing/ABI encoding, so the numbers
+show how much the split removes GIL contention, not chain latency.
+
+Run from the copybot directory:
+
+    python benchmarks/bench_process_runner.py
+"""
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from models.trade_order import TradeOrder
+from process_runner import ProcessSupervisor, executor_index
+
+
+ORDERS_PER_WATCHER = 4000
+WATCH_WORK = 200     # sha256 rounds per order on the watcher side
+EXECUTE_WORK = 600   # sha256 rounds per order on the executor side
+
+
+def busy(rounds: int):
+    digest = b"copybot"
+    for _ in range(rounds):
+        digest = hashlib.sha256(digest).digest()
+
+
+def make_order(i: int) -> TradeOrder:
+    return TradeOrder('BUY' if i % 2 else 'SELL', 'TKN', f"0x{i:040x}", 18)
+
+
+def bench_watcher(config_path, leader_addresses, order_queues, stop_event):
+    for leader_address in leader_addresses:
+        offset = int(leader_address) * ORDERS_PER_WATCHER
+        for i in range(offset, offset + ORDERS_PER_WATCHER):
+            busy(WATCH_WORK)
+            order = make_order(i)
+            order_queues[executor_index(order.contract_address, len(order_queues))].put(order.to_bytes())
+
+    stop_event.wait()
+
+
+def bench_executor(config_path, index, executor_count, order_queue, stop_event, counter=None):
+    while True:
+        data = order_queue.get()
+        if data is None:
+            break
+        TradeOrder.from_bytes(data)
+        busy(EXECUTE_WORK)
+        with counter.get_lock():
+            counter.value += 1
+
+
+def single_process(watchers: int) -> float:
+    start = time.perf_counter()
+    for i in range(watchers * ORDERS_PER_WATCHER):
+        busy(WATCH_WORK)
+        make_order(i)
+        busy(EXECUTE_WORK)
+
+    return watchers * ORDERS_PER_WATCHER / (time.perf_counter() - start)
+
+
+def multi_process(watchers: int, executors: int) -> float:
+    counter = multiprocessing.Value('i', 0)
+    total = watchers * ORDERS_PER_WATCHER
+
+    def executor_target(*args):
+        bench_executor(*args, counter=counter)
+
+    supervisor = ProcessSupervisor(None, [str(i) for i in range(watchers)], executors, executors,
+                                   watcher_target=bench_watcher, executor_target=executor_target)
+
+    start = time.perf_counter()
+    supervisor.start()
+    try:
+        while counter.value < total:
+            # Children never exit before the supervisor stops them, a dead one would hang the count
+            for process in list(supervisor.watchers.values()) + list(supervisor.executors.values()):
+                if not process.is_alive():
+                    raise RuntimeError(f"{process.name} exited with code {process.exitcode}")
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+    finally:
+        supervisor.stop()
+
+    return total / elapsed
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method('fork')
+
+    print(f"cpu count: {os.cpu_count()}")
+    print(f"single process             {single_process(2):>10.0f} orders/s")
+    for watchers, executors in ((1, 1), (1, 2), (2, 2), (2, 4)):
+        print(f"{watchers} watchers {executors} executors   {multi_process(watchers, executors):>10.0f} orders/s")
@@ -0,0 +1,58 @@
+"""
+Benchmark of the local route search as the pair graph grows.
+
+Builds a fully connected graph of N base tokens plus two endpoint tokens
+that are paired with every base token, then times PairGraph.best_path for
+1-3 hop routes. Run from the copybot directory:
+
+    python benchmarks/bench_route_finder.py
+"""
+import os
+import random
+import sys
+import time
+import itertools
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from network.pair_graph import PairGraph
+
+
+def build_graph(base_count: int) -> PairGraph:
+    rnd = random.Random(base_count)
+    graph = PairGraph(reserves_ttl=3600)
+
+    tokens = [f"0x{i:040x}" for i in range(base_count + 2)]
+    bases, endpoints = tokens[:base_count], tokens[base_count:]
+
+    pair_id = itertools.count()
+    for token_a, token_b in itertools.combinations(bases, 2):
+        graph.add_pair(f"pair{next(pair_id)}", token_a, token_b, rnd.randint(10 ** 20, 10 ** 24), rnd.randint(10 ** 20, 10 ** 24))
+
+    for endpoint in endpoints:
+        for base in bases:
+            graph.add_pair(f"pair{next(pair_id)}", endpoint, base, rnd.randint(10 ** 20, 10 ** 24), rnd.randint(10 ** 20, 10 ** 24))
+
+    return graph, endpoints
+
+
+def bench(base_count: int, iterations: int):
+    graph, (token_in, token_out) = build_graph(base_count)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        paths = graph.candidate_paths(token_in, token_out, max_hops=3)
+    search = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        graph.best_path(token_in, token_out, 10 ** 18, paths=paths)
+    quote = (time.perf_counter() - start) / iterations
+
+    print(f"{base_count:>5} base tokens {len(graph.pairs):>6} pairs {len(paths):>6} paths "
+          f"search {search * 1e6:>10.1f} us  quote {quote * 1e6:>10.1f} us")
+
+
+if __name__ == "__main__":
+    for base_count in (3, 5, 8, 12, 20, 40):
+        bench(base_count, iterations=max(10, 20000 // (base_count ** 2)))
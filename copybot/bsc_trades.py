@@ -1,18 +1,35 @@
 import time
 import os
 
+from concurrent.futures import Future
+from typing import Union
 from utils import utils
+from utils import trade_rules
+from utils.swap_aggregator import aggregate_swaps
 from utils.config import Configuration
 from copybot import CopyBot
 from models.trade_order import TradeOrder
-from bscscan import BscScan
+from models.swap_event import SwapEvent
+from network.bscscan_client import BscScanClient
 
 
 logger = utils.create_logger(__name__)
 
 
+# Longest wait, in blocks, between retries of a failed exit SELL
+MAX_EXIT_RETRY_BLOCKS = 64
+
+
+def leader_addresses(config: dict) -> list:
+    """
+    Leaders to copy from the 'bsc_trades' section: 'listen_to_addresses', or
+    the single 'listen_to_address' when that list is empty
+    """
+    return list(config.get('listen_to_addresses') or [config.get('listen_to_address')])
+
+
 class BscTrades:
-    def __init__(self, bot: CopyBot, path_to_config):
+    def __init__(self, bot: CopyBot, path_to_config, address: str = None):
         self.path_to_config = path_to_config
         self.config = self._load_config(path_to_config)
         
@@ -22,9 +39,25 @@ class BscTrades:
         # Dictionary should contain tokens waiting for us to SELL
         self.open_swaps = {} 
 
-        self.address = self.config.get('listen_to_address')
+        self.address = address or self.config.get('listen_to_address')
         self.bot = bot
 
+        self.token_blacklist = set(address.upper() for address in self.config.get('token_blacklist') or [])
+
+        # With snapshots, exits are detected from the leader's actual balances instead of single transfers
+        self.position_snapshotter = None
+
+        # Token -> (snapshot block, attempts) of exits whose SELL failed, retried with backoff
+        self.failed_exits = {}
+
+        # Token -> (TradeOrder, Future, position) of orders still executing on a lane worker
+        self.pending_orders = {}
+        if bool(int(self.config.get('position_snapshots', 0))):
+            self.position_snapshotter = bot.get_position_snapshotter()
+
+        # BscScan client, created by connect() during warm-up or on first poll
+        self.bsc = None
+
     def _load_config(self, config) -> dict:
         """
         Load section from properties file into a dictionary
@@ -32,7 +65,16 @@ class BscTrades:
         config_parser = Configuration(os.path.abspath(config))
         return dict(config_parser.get_config()['bsc_trades'])
 
-    def get_account_transactions(self, bsc: BscScan, address: str) -> list:
+    def connect(self) -> BscScanClient:
+        """
+        Creates the BscScan client on the bot's shared HTTP transport
+        """
+        if self.bsc is None:
+            self.bsc = BscScanClient(api_key=str(self.config.get('api_key')), transport=self.bot.transport)
+
+        return self.bsc
+
+    def get_account_transactions(self, bsc: BscScanClient, address: str) -> list:
         """ 
         Call to the bscscan.com API to retrieve token 
         transfer events for a specific addresss
@@ -51,97 +93,212 @@ class BscTrades:
 
         return int(timediff)
 
-    def create_trade_order(self, order_type: str, transaction: dict) -> dict:
+    def create_trade_order(self, order_type: str, contract_address: str, token_symbol: str, token_decimals: int) -> TradeOrder:
         """
         Function creates a TradeOrder object which will be passed
         along to our trade execution bot to action on.
         """
-        order = TradeOrder(order_type, transaction.get('tokenSymbol'), 
-                        transaction.get('contractAddress'), int(transaction.get('tokenDecimal'))
+        token_info = self.bot.token_registry.register(contract_address, token_symbol, token_decimals)
+
+        order = TradeOrder(order_type, token_info.symbol, 
+                        contract_address, token_info.decimals
                 )
 
         return order
 
     def _process_transactions(self, transactions: list):
         """
-        Function iterates through all elements in the transactions list with 
-        the goal of identifying actionable transactions to execute
+        Function groups the transfers in the transactions list into one swap
+        event per transaction hash, with the goal of identifying actionable
+        swaps to execute
         """
         check_freshness = bool(int(self.config.get('check_freshness')))
 
-        for transaction in transactions:
-            tran_type = None
-
-            txn_hash = str(transaction.get('hash'))
-            txn_timestamp = int(transaction.get('timeStamp'))
-            txn_to = str(transaction.get('to'))
-            
-            symbol = str(transaction.get('tokenSymbol'))
-            contract_address = str(transaction.get('contractAddress'))
-            
-            if txn_hash not in self.txn_seen:
-                if  check_freshness and self.get_unix_timediff_in_seconds(txn_timestamp) > 60:
-                    logger.info(f"Transaction={txn_hash} is older than 60 seconds")
-                    
-                    self.txn_seen[txn_hash] = True
-                    continue
-
-                if contract_address.upper() in self.token_blacklist:
-                    logger.info(f"{txn_hash} involves a blacklisted token. Moving to next transaction.")
-
-                    self.txn_seen[txn_hash] = True
-                    continue 
-                
-
-                if txn_to.upper() == self.address.upper():
-                    tran_type = 'BUY'
-                else:
-                    tran_type = 'SELL'
-
-                if tran_type == 'SELL' and contract_address in self.open_swaps:
-                    logger.debug(f"Found actionable {tran_type} transaction: {txn_hash}")
-
-                    sell_percentage = int((int(transaction.get('value')) / self.open_swaps.get(contract_address)) * 100)
-                    if sell_percentage >= 50:
-                        if bool(int(self.config.get('send_sell_orders'))):
-                            trade_order = self.create_trade_order(tran_type, transaction)
-                            
-                            is_success = self._send_order_to_execute(trade_order=trade_order)
-
-                            if is_success: 
-                                del self.open_swaps[contract_address]
-                        else:
-                            logger.debug(f"SELL orders are disabled. Review 'send_sell_orders' property.")    
-                    else:
-                        logger.info(f"SELL transaction, {txn_hash}, does not reach 50% value threshold. Not executing transaction.")
-                    
-                    self.txn_seen[txn_hash] = True
-
-                elif tran_type == 'BUY' and contract_address not in self.open_swaps:
-                    logger.debug(f"Found actionable {tran_type} transaction: {txn_hash}")
-
-                    trade_order = self.create_trade_order(tran_type, transaction)
-
-                    is_success = self._send_order_to_execute(trade_order=trade_order)
-
-                    if is_success: 
-                        self.open_swaps[contract_address] = int(transaction.get('value'))
-                    
-                    self.txn_seen[txn_hash] = True 
-                
-                else:
-                    logger.debug(f"{txn_hash} does not meet trade/swap conditions. Moving to next transaction...")
-
-                    self.txn_seen[txn_hash] = True
-                    continue
-            
-            else:
+        for event in aggregate_swaps(transactions, self.address):
+            txn_hash = event.txn_hash
+
+            if txn_hash in self.txn_seen:
                 logger.debug(f"Already saw {txn_hash}")
                 continue
 
-    def _send_order_to_execute(self, trade_order: TradeOrder) -> bool:
+            self.txn_seen[txn_hash] = True
+
+            if check_freshness and self.get_unix_timediff_in_seconds(event.timestamp) > 60:
+                logger.info(f"Transaction={txn_hash} is older than 60 seconds")
+                continue
+
+            # A token to token swap is both a SELL of token_in and a BUY of token_out
+            is_actionable = self._process_sell(event)
+            is_actionable = self._process_buy(event) or is_actionable
+
+            if not is_actionable:
+                logger.debug(f"{txn_hash} does not meet trade/swap conditions. Moving to next transaction...")
+
+    def _is_blacklisted(self, txn_hash: str, contract_address: str) -> bool:
+        if contract_address.upper() in self.token_blacklist:
+            logger.info(f"{txn_hash} involves a blacklisted token. Moving to next transaction.")
+            return True
+
+        return False
+
+    def _process_sell(self, event: SwapEvent) -> bool:
+        """
+        Sells our position when the leader sold at least the threshold of theirs
+        """
+        contract_address = event.token_in
+        if contract_address is None or contract_address not in self.open_swaps or self._is_blacklisted(event.txn_hash, contract_address):
+            return False
+
+        if contract_address in self.pending_orders:
+            logger.info(f"{event.txn_hash} sells {contract_address} while our previous order is still executing. Not executing transaction.")
+            return True
+
+        if self.position_snapshotter:
+            logger.debug(f"{event.txn_hash} sells {contract_address}, exit is decided by the next position snapshot")
+            return True
+
+        logger.debug(f"Found actionable SELL transaction: {event.txn_hash}")
+
+        if trade_rules.meets_sell_threshold(event.amount_in, self.open_swaps.get(contract_address)):
+            self._execute_sell(contract_address, event.token_in_symbol, event.token_in_decimals)
+        else:
+            logger.info(f"SELL transaction, {event.txn_hash}, does not reach {trade_rules.SELL_THRESHOLD_PERCENT}% value threshold. Not executing transaction.")
+
+        return True
+
+    def _execute_sell(self, contract_address: str, token_symbol: str, token_decimals: int) -> bool:
+        trade_order = self.create_trade_order('SELL', contract_address, token_symbol, token_decimals)
+
+        if not bool(int(self.config.get('send_sell_orders'))):
+            logger.debug(f"SELL orders are disabled. Review 'send_sell_orders' property.")
+            self._apply_result(trade_order, False)
+            return False
+
+        return self._submit(trade_order)
+
+    def _submit(self, trade_order: TradeOrder, position: int = None) -> bool:
         """
-        Transfers trade orders to the trading bot to execute
+        Sends the order and applies its result. Orders queued on a lane worker
+        are applied by _collect_results() once the lane reports back. Returns
+        False when the order failed.
+        """
+        result = self._send_order_to_execute(trade_order=trade_order)
+
+        if isinstance(result, Future):
+            self.pending_orders[trade_order.contract_address] = (trade_order, result, position)
+            return True
+
+        self._apply_result(trade_order, result, position)
+
+        return result
+
+    def _collect_results(self):
+        """
+        Applies the results of orders whose lane worker has finished
+        """
+        for contract_address, (trade_order, future, position) in list(self.pending_orders.items()):
+            if not future.done():
+                continue
+
+            del self.pending_orders[contract_address]
+
+            try:
+                is_success = bool(future.result())
+            except Exception as e:
+                logger.error(f"{trade_order.order_type} order for {contract_address} failed: {e}")
+                is_success = False
+
+            self._apply_result(trade_order, is_success, position)
+
+    def _apply_result(self, trade_order: TradeOrder, is_success: bool, position: int = None):
+        contract_address = trade_order.contract_address
+
+        if trade_order.order_type == 'BUY':
+            if is_success:
+                self.open_swaps[contract_address] = position
+
+                if self.position_snapshotter:
+                    self.position_snapshotter.track(self.address, contract_address)
+            return
+
+        if is_success:
+            self.open_swaps.pop(contract_address, None)
+            self.failed_exits.pop(contract_address, None)
+
+            if self.position_snapshotter:
+                self.position_snapshotter.untrack(self.address, contract_address)
+
+        elif self.position_snapshotter:
+            _, attempts = self.failed_exits.get(contract_address, (None, 0))
+            self.failed_exits[contract_address] = (self.position_snapshotter.block, attempts + 1)
+
+    def _check_exits(self):
+        """
+        Compares the leader's current holdings of every open swap with the
+        position we copied and sells once they dropped past the threshold.
+        Balances come from one batched snapshot per block.
+        """
+        if not self.position_snapshotter or not self.open_swaps:
+            return
+
+        self.position_snapshotter.refresh()
+
+        for contract_address, position in list(self.open_swaps.items()):
+            balance = self.position_snapshotter.balance(self.address, contract_address)
+            if balance is None or contract_address in self.pending_orders:
+                continue
+
+            # Extra buys grow the position exits are measured against
+            if balance > position:
+                self.open_swaps[contract_address] = position = balance
+
+            if not trade_rules.meets_sell_threshold(position - balance, position):
+                self.failed_exits.pop(contract_address, None)
+                continue
+
+            if not self._should_retry_exit(contract_address):
+                continue
+
+            logger.info(f"Leader holds {balance} of {contract_address}, down from {position}. Found actionable SELL.")
+
+            token_info = self.bot.token_registry.get(contract_address)
+            self._execute_sell(contract_address, token_info.symbol if token_info else None,
+                               token_info.decimals if token_info and token_info.decimals is not None else 18)
+
+    def _should_retry_exit(self, contract_address: str) -> bool:
+        """
+        A failed exit is retried on a later snapshot block, waiting twice as
+        many blocks after each failure (at most MAX_EXIT_RETRY_BLOCKS)
+        """
+        if contract_address not in self.failed_exits:
+            return True
+
+        block, attempts = self.failed_exits[contract_address]
+        wait_blocks = min(2 ** (attempts - 1), MAX_EXIT_RETRY_BLOCKS)
+
+        return self.position_snapshotter.block >= block + wait_blocks
+
+    def _process_buy(self, event: SwapEvent) -> bool:
+        """
+        Copies the leader's BUY of a token we don't hold yet
+        """
+        contract_address = event.token_out
+        if contract_address is None or contract_address in self.open_swaps or contract_address in self.pending_orders \
+                or self._is_blacklisted(event.txn_hash, contract_address):
+            return False
+
+        logger.debug(f"Found actionable BUY transaction: {event.txn_hash}")
+
+        trade_order = self.create_trade_order('BUY', contract_address, event.token_out_symbol, event.token_out_decimals)
+
+        self._submit(trade_order, event.amount_out)
+
+        return True
+
+    def _send_order_to_execute(self, trade_order: TradeOrder) -> Union[bool, Future]:
+        """
+        Transfers trade orders to the trading bot to execute. The bot returns
+        a Future of the result when the order runs on a lane worker.
         """
         send_flag = bool(int(self.config.get('send_trade_orders')))
         
@@ -152,29 +309,71 @@ class BscTrades:
             logger.debug(f"Did not execute trade. 'send_trade_order' property set to {send_flag}")
             return False
 
-    def listen_and_execute(self):
+    def poll(self, bsc: BscScanClient) -> bool:
+        """
+        Processes the leader's latest transactions once. Returns False when
+        the poll failed.
+        """
+        try:
+            self._collect_results()
+
+            logger.info(f"PROCESSING TRANSACTIONS from {self.address}")
+
+            transactions = self.get_account_transactions(bsc, self.address)
+
+            transactions = transactions[0:15]
+            transactions.reverse()
+
+            self._process_transactions(transactions)
+
+            return True
+        except  Exception as e:
+            logger.error(f"{e}")
+            return False
+
+    def poll_exits(self) -> bool:
+        """
+        Checks open positions for exits once. Returns False when the check failed.
+        """
+        try:
+            self._collect_results()
+            self._check_exits()
+
+            return True
+        except  Exception as e:
+            logger.error(f"{e}")
+            return False
+
+    def listen_and_execute(self, stop_event=None):
         """
         This method pulls the transaction made by a specific wallet address
         every 0.5 seconds. It then sends the list of transactions proccessed   
+
+        Runs until stop_event (a threading/multiprocessing Event) is set, or forever without one.
         """
-        key = str(self.config.get('api_key'))
-        bsc = BscScan(api_key=key)
+        listen_to_leaders([self], stop_event)
 
-        while True:
-            try:
-                logger.info(f"PROCESSING TRANSACTIONS from {self.address}")
 
-                transactions = self.get_account_transactions(bsc, self.address)
+def listen_to_leaders(watchers: list, stop_event=None):
+    """
+    Polls several leaders in turn on one thread. Watchers built on the same
+    bot share its position snapshotter, so the balances of all their open
+    positions are fetched in one batched snapshot per block.
+    """
+    clients = [watcher.connect() for watcher in watchers]
 
-                transactions = transactions[0:15]
-                transactions.reverse()
+    while stop_event is None or not stop_event.is_set():
+        is_success = True
+        for watcher, bsc in zip(watchers, clients):
+            is_success = watcher.poll(bsc) and is_success
 
-                self._process_transactions(transactions)
-                logger.debug("Sleeping...\n")
+        # After every leader was polled, so one snapshot covers all new positions
+        for watcher in watchers:
+            is_success = watcher.poll_exits() and is_success
 
-                time.sleep(0.5)
-            except  Exception as e:
-                logger.error(f"{e}")
-                logger.info("Sleeping for 2.5 seconds then retrying...")
-                time.sleep(2.5) 
-            
\ No newline at end of file
+        if is_success:
+            logger.debug("Sleeping...\n")
+            time.sleep(0.5)
+        else:
+            logger.info("Sleeping for 2.5 seconds then retrying...")
+            time.sleep(2.5)
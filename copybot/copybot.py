@@ -1,11 +1,24 @@
-import pyetherbalance
-import sys
+import time
+import threading
 import traceback 
-import requests
 import os
 
+from concurrent.futures import Future
+from typing import Union
 from network.pancakeswap import Pancakeswap
+from network.route_finder import RouteFinder
+from network.token_metadata import TokenMetadataFetcher
+from network.multicall import Multicall
+from network.transport import HttpTransport
+from network.rpc_provider import MultiEndpointProvider, provider_from_config
+from network.swap_simulator import SwapSimulator, VerdictCache
+from eth_abi import decode_single
+from token_registry import TokenRegistry
 from models.trade_order import TradeOrder
+from models.execution_lane import ExecutionLane
+from lane_pool import LanePool
+from lane_workers import LaneWorkers
+from leader_positions import PositionSnapshotter
 from web3 import Web3, types
 from utils import utils
 from utils.config import Configuration
@@ -20,7 +33,37 @@ class CopyBot:
         self.path_to_config = path_to_config
         self.__load_config(path_to_config)
 
-        self.bsc_wallet_checker = pyetherbalance.PyEtherBalance(self.config.get('chain_url'))
+        self.transport = HttpTransport.from_config(self.config)
+
+        # Connection and per-lane Pancakeswap clients are kept between trades
+        # so only the first trade (or the warm-up) pays for them
+        self.w3 = None
+        self.pancakeswaps = {}
+
+        # ERC20 contracts of the tokens whose balances we checked, by address
+        self.erc20_contracts = {}
+
+        self.lane_pool = LanePool.from_config(self.config)
+
+        # Started with the first order, see get_lane_workers()
+        self.lane_workers = None
+
+        # Guards the lazily created clients shared by the lane workers
+        self._lock = threading.RLock()
+
+        self.token_registry = TokenRegistry.from_config(self.config, path_to_config)
+
+        # Buy/sell verdicts from pre-flight simulations, shared by all lanes
+        self.verdict_cache = VerdictCache(ttl=float(self.config.get('simulation_cache_ttl', 600)))
+
+        # Built on first trade, then reused so pair addresses and reserves stay cached
+        self.route_finder = None
+
+        # Shared by every BscTrades watching a leader through this bot
+        self.position_snapshotter = None
+
+        self.bnb_price = None
+        self.bnb_price_updated = 0.0
 
 
     def __load_config(self, config):
@@ -29,52 +72,271 @@ class CopyBot:
         self.config = dict(config_parser.get_config()['copybot'])
 
 
-    def put_token_in_wallet_checker(self, token_name, token_address, token_decimals):
+    def get_token_balance_in_wallet(self, my_address, token_name, token_address, token_decimals):
         """
-        Function that adds incoming token to bsc_wallet_checker
+        Checks a wallet address for a particular token's balance, in whole
+        tokens. Reads go through get_web3(), so they use every configured
+        endpoint.
         """
-        token_details = {
-                'symbol': token_name.upper(), 
-                'address': token_address,
-                'decimals': token_decimals,
-                'name': token_name.upper()
-            }
-        
-        self.bsc_wallet_checker.add_token(token_name.upper(), token_details)
+        w3 = self.get_web3()
+
+        if token_name == 'BNB':
+            return float(Web3.fromWei(w3.eth.get_balance(w3.toChecksumAddress(my_address)), 'ether'))
 
+        token_info = self.token_registry.get(token_address)
+        if token_info and token_info.decimals is not None:
+            token_decimals = token_info.decimals
 
-    def get_token_balance_in_wallet(self, my_address, token_name, token_address, token_decimals):
+        erc20 = self.erc20_contracts.get(token_address.lower())
+        if erc20 is None:
+            erc20 = utils.load_contract("erc20", w3.toChecksumAddress(token_address), w3, "pancakeswap")
+            self.erc20_contracts[token_address.lower()] = erc20
+
+        balance = erc20.functions.balanceOf(w3.toChecksumAddress(my_address)).call()
+
+        return balance / 10 ** int(token_decimals)
+
+
+    def get_route_finder(self, pancakeswap: Pancakeswap) -> RouteFinder:
         """
-        Using the pyetherbalance library, check a wallet address for a 
-        particular token's balance.
+        Returns the shared route finder, or None when no 'route_base_tokens' are configured
         """
-        if token_name == 'BNB':
-            balance = self.bsc_wallet_checker.get_eth_balance(my_address).get('balance')
-            return float(balance)
-    
-        if token_name not in self.bsc_wallet_checker.erc20_tokens:
-            self.put_token_in_wallet_checker(token_name=token_name, token_address=token_address, token_decimals=token_decimals)
+        base_tokens = self.config.get('route_base_tokens') or []
+
+        with self._lock:
+            if self.route_finder is None and base_tokens:
+                self.route_finder = RouteFinder(pancakeswap.w3, pancakeswap.factory, base_tokens,
+                                                reserves_ttl=float(self.config.get('route_reserves_ttl', 3)))
+
+        return self.route_finder
+
+
+    def get_lane_workers(self) -> LaneWorkers:
+        """
+        With several wallets and 'parallel_lanes' on, each lane executes on its
+        own thread so one slow or stuck lane never holds up the others.
+        Returns None when orders run on the caller's thread.
+        """
+        with self._lock:
+            if self.lane_workers is None and len(self.lane_pool.lanes) > 1 and bool(int(self.config.get('parallel_lanes', 1))):
+                self.lane_workers = LaneWorkers(self.lane_pool.lanes, self.execute_on_lane)
 
-        balance = self.bsc_wallet_checker.get_token_balance(token_name.upper(), my_address).get('balance')
+        return self.lane_workers
+
+
+    def get_web3(self) -> Web3:
+        with self._lock:
+            if self.w3 is None:
+                w3 = Web3(provider_from_config(self.config, self.transport))
+                w3.eth.setGasPriceStrategy(fast_gas_price_strategy)
+                self.w3 = w3
+
+        return self.w3
+
+
+    def get_position_snapshotter(self) -> PositionSnapshotter:
+        with self._lock:
+            if self.position_snapshotter is None:
+                w3 = self.get_web3()
+                self.position_snapshotter = PositionSnapshotter(w3, Multicall(w3))
+
+        return self.position_snapshotter
+
+
+    def get_pancakeswap(self, my_address, pk, max_slippage, lane: ExecutionLane = None) -> Pancakeswap:
+        """
+        Returns the cached Pancakeswap client of a wallet, creating it (contract
+        loads and nonce fetch) on first use
+        """
+        pancakeswap = self.pancakeswaps.get(my_address)
+
+        if pancakeswap is None:
+            approved_tokens = lane.approved_tokens if lane else None
+            pancakeswap = Pancakeswap(my_address, pk, web3=self.get_web3(), version=2, max_slippage=max_slippage, approved_tokens=approved_tokens,
+                                      token_registry=self.token_registry)
+
+            pancakeswap.route_finder = self.get_route_finder(pancakeswap)
+            self.attach_token_fetcher(pancakeswap)
+
+            if bool(int(self.config.get('simulate_swaps', 1))):
+                pancakeswap.swap_simulator = SwapSimulator(pancakeswap.w3, self.verdict_cache)
+
+            self.pancakeswaps[my_address] = pancakeswap
+
+        pancakeswap.max_slippage = max_slippage
+
+        return pancakeswap
+
+
+    def get_bnb_price(self) -> float:
+        """
+        BNB price in USD from Binance, cached for 'price_cache_ttl' seconds
+        """
+        ttl = float(self.config.get('price_cache_ttl', 10))
+
+        if self.bnb_price is None or time.time() - self.bnb_price_updated > ttl:
+            self.bnb_price = float((self.transport.get('https://api.binance.com/api/v3/ticker/price?symbol=BNBUSDC').json())['price'])
+            self.bnb_price_updated = time.time()
+
+        return self.bnb_price
+
+
+    def precheck_approvals(self) -> int:
+        """
+        Checks router allowances of every registry token for every lane in one
+        multicall, so later trades skip the allowance call. Returns the number
+        of (lane, token) approvals found.
+        """
+        tokens = [token.address for token in self.token_registry.tokens.values()]
+        if not tokens:
+            return 0
 
-        return float(balance)
+        checks = []
+        for lane in self.lane_pool.lanes:
+            pancakeswap = self.get_pancakeswap(lane.address, lane.private_key, float(self.config.get('max_slippage')), lane)
+            router = utils.addr_to_str(pancakeswap.router_address_v2)
 
+            for token in tokens:
+                if not self.token_registry.is_approved(token, lane.address):
+                    erc20 = utils.load_contract("erc20", utils.addr_to_str(token), pancakeswap.w3, "pancakeswap")
+                    calldata = erc20.encodeABI(fn_name='allowance', args=[utils.addr_to_str(lane.address), router])
+                    checks.append((pancakeswap, erc20.address, (erc20.address, calldata)))
 
-    def process_trade_order(self, trade_order: TradeOrder) -> bool:
+        results = Multicall(self.get_web3()).aggregate([call for _, _, call in checks])
+
+        approved = 0
+        for (pancakeswap, token, _), (success, data) in zip(checks, results):
+            if success and data and decode_single('uint256', data) >= pancakeswap.max_approval_check_int:
+                pancakeswap._set_approved(token)
+                approved += 1
+
+        self.save_token_registry()
+
+        return approved
+
+
+    def restore_open_tokens(self) -> int:
+        """
+        Rebuilds token -> lane stickiness after a restart from the lanes'
+        balances of every registry token, read in one multicall. A token held
+        by several lanes goes to the one holding the most. Returns the number
+        of tokens restored.
+        """
+        tokens = [token.address for token in self.token_registry.tokens.values()]
+        if not tokens:
+            return 0
+
+        w3 = self.get_web3()
+
+        # Any ERC20 contract works for encoding, the target address is set per call
+        erc20 = utils.load_contract("erc20", utils.addr_to_str(tokens[0]), w3, "pancakeswap")
+
+        checks = []
+        for lane in self.lane_pool.lanes:
+            calldata = erc20.encodeABI(fn_name='balanceOf', args=[utils.addr_to_str(lane.address)])
+            for token in tokens:
+                checks.append((lane, token, (utils.addr_to_str(token), calldata)))
+
+        results = Multicall(w3).aggregate([call for _, _, call in checks])
+
+        # token -> (balance, lane) of its largest holder
+        holders = {}
+        for (lane, token, _), (success, data) in zip(checks, results):
+            balance = decode_single('uint256', data) if success and data else 0
+            if balance > holders.get(token.lower(), (0, None))[0]:
+                holders[token.lower()] = (balance, lane)
+
+        for token, (_, lane) in holders.items():
+            self.lane_pool.restore_open_token(lane, token)
+
+        logger.info(f"Restored {len(holders)} open tokens across {len(self.lane_pool.lanes)} lanes")
+
+        return len(holders)
+
+
+    def save_token_registry(self):
+        """
+        Persists the token registry. A failed write is only logged, the
+        registry is still complete in memory and the next save retries it.
+        """
+        try:
+            self.token_registry.save()
+        except Exception:
+            logger.error(f"Could not save token registry: {traceback.format_exc()}")
+
+
+    def attach_token_fetcher(self, pancakeswap: Pancakeswap):
+        """
+        Lets the token registry fill missing metadata from the chain
+        """
+        with self._lock:
+            if self.token_registry.fetcher is None:
+                self.token_registry.fetcher = TokenMetadataFetcher(pancakeswap.w3, utils.addr_to_str(pancakeswap.factory_address_v2),
+                                                                   pancakeswap.get_weth_address())
+
+
+    def process_trade_order(self, trade_order: TradeOrder) -> Union[bool, Future]:
+        """
+        Executes the order on its lane and returns whether it was sent. With
+        lane workers the order is queued on the lane's thread instead and a
+        Future of that result is returned.
+        """
         logger.debug('Received trade order to execute')
-        
+
+        lane = self.lane_pool.lane_for(trade_order)
+        logger.debug(f"Assigned {trade_order.order_type} order for {trade_order.contract_address} to lane {lane.lane_id} ({lane.address})")
+
+        lane_workers = self.get_lane_workers()
+        if lane_workers:
+            return lane_workers.submit(lane, trade_order)
+
+        return self.execute_on_lane(lane, trade_order)
+
+
+    def execute_on_lane(self, lane: ExecutionLane, trade_order: TradeOrder) -> bool:
         if trade_order.order_type == 'BUY':
-            return self.exec_trade(trade_order.order_type, trade_order.contract_address, self.config.get('main_coin'), self.config.get('main_coin_contract_address'),
-                            self.config.get('my_address'), self.config.get('my_pk'), float(self.config.get('max_slippage')), self.config.get('chain_url'),
-                            int(self.config.get('maxgwei')), 18)
+            is_success = self.exec_trade(trade_order.order_type, trade_order.contract_address, self.config.get('main_coin'), self.config.get('main_coin_contract_address'),
+                            lane.address, lane.private_key, float(self.config.get('max_slippage')), self.config.get('chain_url'),
+                            int(self.config.get('maxgwei')), 18, lane=lane)
         
         else:
-            return self.exec_trade(trade_order.order_type, self.config.get('main_coin_contract_address'), trade_order.token_symbol, trade_order.contract_address, 
-                            self.config.get('my_address'), self.config.get('my_pk'), float(self.config.get('max_slippage')), self.config.get('chain_url'),
-                            int(self.config.get('maxgwei')), trade_order.token_decimals)
+            is_success = self.exec_trade(trade_order.order_type, self.config.get('main_coin_contract_address'), trade_order.token_symbol, trade_order.contract_address, 
+                            lane.address, lane.private_key, float(self.config.get('max_slippage')), self.config.get('chain_url'),
+                            int(self.config.get('maxgwei')), trade_order.token_decimals, lane=lane)
+
+        self.lane_pool.record_result(lane, trade_order, is_success)
+        self.log_lane_report()
+        self.transport.log_stats()
+
+        if isinstance(self.w3.provider, MultiEndpointProvider):
+            self.w3.provider.log_endpoint_report()
 
+        return is_success
 
-    def exec_trade(self, order_type, buytoken_address, sell_token_name, selltoken_address, my_address, pk, max_slippage, chain_url, maxgwei, selldecimals: int, amount=None) -> bool:
+
+    def stop(self):
+        """
+        Lets the lane workers finish the orders they already have
+        """
+        if self.lane_workers:
+            self.lane_workers.stop()
+
+
+    def log_lane_report(self):
+        """
+        Logs aggregate nonce, balance and order counts across execution lanes
+        """
+        report = self.lane_pool.report()
+
+        for lane in report['lanes']:
+            logger.debug(f"Lane {lane['lane_id']} ({lane['address']}): nonce={lane['nonce']} bnb={lane['bnb_balance']} "
+                         f"open_tokens={lane['open_tokens']} sent={lane['orders_sent']} failed={lane['orders_failed']}")
+
+        logger.info(f"Lanes={len(report['lanes'])} total_bnb={report['total_bnb_balance']} open_tokens={report['total_open_tokens']} "
+                    f"sent={report['total_orders_sent']} failed={report['total_orders_failed']}")
+
+
+    def exec_trade(self, order_type, buytoken_address, sell_token_name, selltoken_address, my_address, pk, max_slippage, chain_url, maxgwei, selldecimals: int, amount=None, lane: ExecutionLane = None) -> bool:
         """
         Executes a trade on the Pancakeswap
         """
@@ -86,18 +348,29 @@ class CopyBot:
             amount = float(self.config.get('buy_amount_usd'))
 
         try:
-            w3 = Web3(Web3.HTTPProvider(chain_url))
-            w3.eth.setGasPriceStrategy(fast_gas_price_strategy)
+            pancakeswap = self.get_pancakeswap(my_address, pk, max_slippage, lane)
+            w3 = pancakeswap.w3
 
             sell_token = w3.toChecksumAddress(selltoken_address)
             buy_token = w3.toChecksumAddress(buytoken_address)
 
             gwei = types.Wei(Web3.toWei(int(maxgwei), "gwei"))
 
-            pancakeswap = Pancakeswap(my_address, pk, web3=Web3(w3.HTTPProvider(chain_url)), version=2, max_slippage=max_slippage)
+            if order_type == 'SELL':
+                token_info = self.token_registry.get(selltoken_address)
+                if token_info is None or token_info.decimals is None:
+                    token_info = self.token_registry.resolve([selltoken_address])[selltoken_address]
+
+                selldecimals = token_info.decimals if token_info.decimals is not None else selldecimals
+
+            if lane:
+                # Continue the lane's own nonce sequence in case the node hasn't seen our last transaction yet
+                pancakeswap.last_nonce = max(pancakeswap.last_nonce, lane.last_nonce)
 
 
             total_bnb_in_wallet = self.get_token_balance_in_wallet(my_address, self.config.get('main_coin'), self.config.get('main_coin_contract_address'), 18)
+            if lane:
+                lane.bnb_balance = total_bnb_in_wallet
 
             # Check that we have enough BNB in wallet
             if check_min_amount and total_bnb_in_wallet < float(self.config.get('min_amount_to_keep')):
@@ -105,7 +378,7 @@ class CopyBot:
                 return False
 
             if order_type == 'BUY':
-                current_bnb_price = float((requests.get('https://api.binance.com/api/v3/ticker/price?symbol=BNBUSDC').json())['price'])
+                current_bnb_price = self.get_bnb_price()
                 token_amount = ( amount / current_bnb_price)
 
                 if check_min_amount and (total_bnb_in_wallet - token_amount) < float(self.config.get('min_amount_to_keep')):
@@ -133,6 +406,11 @@ class CopyBot:
             if bool(int(self.config.get('execute_orders'))):
                 # Executes trade
                 pancakeswap.make_trade(sell_token, buy_token, trade_amount, gwei, my_address, pk, my_address)
+
+                if lane:
+                    lane.last_nonce = pancakeswap.last_nonce
+
+                self.save_token_registry()
                 
                 logger.info(f"Trade successfully sent to pancakeswap to execute. Review your wallet's token transfers!")
                 return True
@@ -142,7 +420,7 @@ class CopyBot:
                 return True
 
         except Exception as e:
-            logger.error(f"An error occurred: {traceback.format_exception(sys.exc_info())}")
-            logger.error(f"Terminating app...")
+            # A failed trade must not stop the bot from copying the next one
+            logger.error(f"An error occurred: {traceback.format_exc()}")
             
-            sys.exit()
+            return False
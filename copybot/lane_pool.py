@@ -0,0 +1,115 @@
+import threading
+
+from models.execution_lane import ExecutionLane
+from models.trade_order import TradeOrder
+
+
+class LanePool:
+    """
+    Pool of execution wallets ("lanes"). Each lane has its own nonce
+    sequence, balance and approvals so orders on different lanes never
+    queue behind each other. Tokens are sticky to a lane: the wallet that
+    bought a token is the wallet that sells it.
+    """
+    def __init__(self, lanes: list):
+        if not lanes:
+            raise ValueError("LanePool requires at least one execution wallet")
+
+        self.lanes = lanes
+
+        # Maps lowercase token contract address -> ExecutionLane
+        self.token_lanes = {}
+
+        # Lane workers record results while the polling thread assigns lanes
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'LanePool':
+        """
+        Builds the pool from the 'wallets' list of the copybot section, falling
+        back to the single 'my_address'/'my_pk' wallet when no pool is configured.
+        """
+        wallets = config.get('wallets') or [{'address': config.get('my_address'), 'pk': config.get('my_pk')}]
+
+        lanes = [ExecutionLane(lane_id, wallet.get('address'), wallet.get('pk')) for lane_id, wallet in enumerate(wallets)]
+
+        return cls(lanes)
+
+    def lane_for(self, trade_order: TradeOrder) -> ExecutionLane:
+        """
+        Returns the lane that should execute the order. Tokens already assigned
+        keep their lane, new tokens go to the lane with the fewest tokens.
+        """
+        token = trade_order.contract_address.lower()
+
+        with self._lock:
+            lane = self.token_lanes.get(token)
+            if lane is None:
+                # Assigned tokens include BUYs still queued on a lane worker, not only open ones
+                assigned = {l.lane_id: 0 for l in self.lanes}
+                for assigned_lane in self.token_lanes.values():
+                    assigned[assigned_lane.lane_id] += 1
+
+                lane = min(self.lanes, key=lambda l: (assigned[l.lane_id], l.orders_sent))
+                self.token_lanes[token] = lane
+
+        return lane
+
+    def restore_open_token(self, lane: ExecutionLane, token: str):
+        """
+        Marks a token found in the lane's wallet as bought through it, e.g.
+        after a restart, so its SELL goes to the wallet holding it
+        """
+        token = token.lower()
+
+        with self._lock:
+            lane.open_tokens.add(token)
+            self.token_lanes.setdefault(token, lane)
+
+    def record_result(self, lane: ExecutionLane, trade_order: TradeOrder, is_success: bool):
+        """
+        Updates lane bookkeeping once an order has been processed
+        """
+        token = trade_order.contract_address.lower()
+
+        with self._lock:
+            if not is_success:
+                lane.orders_failed += 1
+
+                # Release the assignment of a token this lane never managed to buy
+                if trade_order.order_type == 'BUY' and token not in lane.open_tokens:
+                    self.token_lanes.pop(token, None)
+                return
+
+            lane.orders_sent += 1
+
+            if trade_order.order_type == 'BUY':
+                lane.open_tokens.add(token)
+            else:
+                lane.open_tokens.discard(token)
+                self.token_lanes.pop(token, None)
+
+    def report(self) -> dict:
+        """
+        Aggregate view across all lanes
+        """
+        lanes = [
+            {
+                'lane_id': lane.lane_id,
+                'address': lane.address,
+                'nonce': lane.last_nonce,
+                'bnb_balance': lane.bnb_balance,
+                'open_tokens': len(lane.open_tokens),
+                'orders_sent': lane.orders_sent,
+                'orders_failed': lane.orders_failed,
+            }
+            for lane in self.lanes
+        ]
+
+        return {
+            'lanes': lanes,
+            'total_bnb_balance': sum(lane.bnb_balance for lane in self.lanes),
+            'total_open_tokens': sum(len(lane.open_tokens) for lane in self.lanes),
+            'total_orders_sent': sum(lane.orders_sent for lane in self.lanes),
+            'total_orders_failed': sum(lane.orders_failed for lane in self.lanes),
+        }
@@ -0,0 +1,70 @@
+import logging
+import queue
+import threading
+
+from concurrent.futures import Future
+from models.execution_lane import ExecutionLane
+from models.trade_order import TradeOrder
+
+
+logger = logging.getLogger(__name__)
+
+
+class LaneWorkers:
+    """
+    One worker thread and order queue per execution lane, so an order stuck
+    on one wallet (e.g. waiting for an approval receipt) never delays the
+    orders of the other wallets. Orders of one lane still run in order and
+    each order's result is reported through the Future returned by submit().
+    """
+    def __init__(self, lanes: list, execute) -> None:
+        # execute(lane, trade_order) runs on the lane's worker thread
+        self.execute = execute
+
+        self.queues = {}
+        self.threads = {}
+
+        for lane in lanes:
+            self.queues[lane.lane_id] = queue.Queue()
+            self.threads[lane.lane_id] = threading.Thread(target=self._run, args=(lane,), name=f"lane-{lane.lane_id}", daemon=True)
+            self.threads[lane.lane_id].start()
+
+    def _run(self, lane: ExecutionLane):
+        order_queue = self.queues[lane.lane_id]
+
+        while True:
+            item = order_queue.get()
+
+            # None is the shutdown sentinel
+            if item is None:
+                break
+
+            trade_order, future = item
+            try:
+                future.set_result(self.execute(lane, trade_order))
+            except Exception as e:
+                logger.exception(f"Lane {lane.lane_id} failed to execute {trade_order.order_type} order for {trade_order.contract_address}")
+                future.set_exception(e)
+
+    def submit(self, lane: ExecutionLane, trade_order: TradeOrder) -> Future:
+        """
+        Queues the order on its lane. The Future resolves to the result of
+        execute once the lane ran it.
+        """
+        future = Future()
+        self.queues[lane.lane_id].put((trade_order, future))
+
+        return future
+
+    def stop(self, timeout: float = 10):
+        """
+        Lets every lane finish the orders already queued, waiting at most
+        timeout seconds per lane
+        """
+        for order_queue in self.queues.values():
+            order_queue.put(None)
+
+        for thread in self.threads.values():
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"{thread.name} did not stop in {timeout}s")
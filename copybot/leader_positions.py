@@ -0,0 +1,77 @@
+import logging
+import threading
+
+from eth_utils import to_checksum_address
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+# balanceOf(address)
+BALANCE_OF_SELECTOR = bytes.fromhex('70a08231')
+
+
+class PositionSnapshotter:
+    """
+    Snapshots the balance of every tracked (leader, token) pair once per block
+    with batched balanceOf calls through Multicall3, so exits can be detected
+    from the leaders' actual holdings instead of individual transfers. One
+    snapshotter is shared by all watched leaders.
+    """
+    def __init__(self, w3, multicall) -> None:
+        self.w3 = w3
+        self.multicall = multicall
+
+        # (leader, token) lowercase -> (token checksum address, balanceOf calldata)
+        self.calls = {}
+        self.balances = {}
+        self.block = None
+
+        self._lock = threading.Lock()
+
+    def track(self, leader: str, token: str):
+        key = (leader.lower(), token.lower())
+
+        with self._lock:
+            if key not in self.calls:
+                calldata = BALANCE_OF_SELECTOR + bytes(12) + bytes.fromhex(leader[2:])
+                self.calls[key] = (to_checksum_address(token), calldata)
+
+    def untrack(self, leader: str, token: str):
+        key = (leader.lower(), token.lower())
+
+        with self._lock:
+            self.calls.pop(key, None)
+            self.balances.pop(key, None)
+
+    def refresh(self) -> bool:
+        """
+        Fetches all tracked balances if a new block was produced since the last
+        snapshot. Returns True when a new snapshot was taken.
+        """
+        block = self.w3.eth.block_number
+
+        with self._lock:
+            if block == self.block:
+                return False
+            keys = list(self.calls)
+            calls = [self.calls[key] for key in keys]
+
+        results = self.multicall.aggregate(calls, block_identifier=block) if calls else []
+
+        balances = {}
+        for key, (success, data) in zip(keys, results):
+            if success and len(data) >= 32:
+                balances[key] = int.from_bytes(data[:32], 'big')
+
+        with self._lock:
+            self.balances = balances
+            self.block = block
+
+        logger.debug(f"Snapshot of {len(balances)} leader positions at block {block}")
+
+        return True
+
+    def balance(self, leader: str, token: str) -> Optional[int]:
+        return self.balances.get((leader.lower(), token.lower()))
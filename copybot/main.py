@@ -2,17 +2,86 @@ import sys
 import os
 
 from argparse import ArgumentParser
-from copybot import CopyBot
-from bsc_trades import BscTrades
+from warmup import StartupTimer, WarmUp
+
+
+def run_backtest(args):
+    from backtest import Backtest, load_transfers, load_reserves, write_results
+
+    if not args.reserves:
+        raise SystemExit("--backtest requires --reserves")
+
+    latencies = tuple(int(latency) for latency in args.latencies.split(','))
+    backtest = Backtest(load_transfers(args.backtest), load_reserves(args.reserves), args.buy_amount_bnb, latencies)
+
+    write_results(backtest.run(), args.output)
+    print(f"Backtest results written to {args.output}")
+
+
+def run_multiprocess(config_path, executor_count, watcher_count):
+    from process_runner import ProcessSupervisor
+    from bsc_trades import leader_addresses
+    from utils.config import Configuration
+
+    config = Configuration(config_path).get_config()
+    leaders = leader_addresses(config['bsc_trades'])
+    wallet_count = len(config['copybot'].get('wallets') or [None])
+
+    ProcessSupervisor(os.path.abspath(config_path), leaders, executor_count, wallet_count, watcher_count).run_forever()
 
 
 def main():
+    parser = ArgumentParser(description="Copies the swaps of a given account")
+    parser.add_argument('--warm-start', action='store_true',
+                        help="Connect, load contracts and prime caches before polling so the first trade is not slower than the rest")
+    parser.add_argument('--multiprocess', action='store_true',
+                        help="Run watchers (one per leader) and executors in separate processes")
+    parser.add_argument('--executors', type=int, default=1, help="Number of executor processes for --multiprocess")
+    parser.add_argument('--watchers', type=int, default=None,
+                        help="Number of watcher processes for --multiprocess, leaders are split between them (default: one per leader)")
+    parser.add_argument('--backtest', nargs='+', metavar='TRANSFERS',
+                        help="Backtest copying the leaders in these transfer histories (.csv/.npz) instead of trading live")
+    parser.add_argument('--reserves', nargs='+', metavar='RESERVES', help="Historical token/WBNB pair reserves (.csv/.npz) for --backtest")
+    parser.add_argument('--buy-amount-bnb', type=float, default=0.01, help="BNB spent per copied BUY in --backtest")
+    parser.add_argument('--latencies', default='0,1,2,5,10', help="Comma separated copy delays in blocks for --backtest")
+    parser.add_argument('--output', default='backtest_results.csv', help="Result file for --backtest")
+    args = parser.parse_args()
+
     config_path = os.path.join(os.path.dirname(__file__), '..', 'properties.yml')
 
-    copybot = CopyBot(path_to_config=config_path)
+    if args.backtest:
+        run_backtest(args)
+        return
+
+    if args.multiprocess:
+        run_multiprocess(config_path, args.executors, args.watchers)
+        return
+
+    timer = StartupTimer()
+
+    # web3 and friends are slow to import, time them as their own phase
+    with timer.phase("imports"):
+        from copybot import CopyBot
+        from bsc_trades import BscTrades, leader_addresses, listen_to_leaders
+        from utils.config import Configuration
+
+    with timer.phase("load config"):
+        copybot = CopyBot(path_to_config=config_path)
 
-    bsc_transaction_executor = BscTrades(bot=copybot, path_to_config=config_path)
-    bsc_transaction_executor.listen_and_execute()
+        # Every leader is polled on this thread and shares the bot's position snapshotter
+        leaders = leader_addresses(Configuration(config_path).get_config()['bsc_trades'])
+        watchers = [BscTrades(bot=copybot, path_to_config=config_path, address=leader_address) for leader_address in leaders]
+
+    if args.warm_start:
+        WarmUp(copybot, watchers[0], timer).run()
+
+    print(timer.report())
+    copybot.transport.log_stats()
+
+    try:
+        listen_to_leaders(watchers)
+    finally:
+        copybot.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+class ExecutionLane:
+    def __init__(self, lane_id: int, address: str, private_key: str):
+        self.lane_id = lane_id
+        self.address = address
+        self.private_key = private_key
+
+        # Per-wallet chain state, so lanes never share a nonce sequence
+        self.last_nonce = 0
+        self.bnb_balance = 0.0
+        self.approved_tokens = set()
+
+        # Tokens bought through this lane that are waiting to be sold
+        self.open_tokens = set()
+
+        self.orders_sent = 0
+        self.orders_failed = 0
@@ -0,0 +1,20 @@
+class SwapEvent:
+    """
+    A leader's transaction reduced to the token they gave up (token_in) and
+    the token they received (token_out), netted over all transfers of the
+    transaction. Either side is None when it was native BNB, which does not
+    show up in BEP20 transfer events.
+    """
+    def __init__(self, txn_hash: str, timestamp: int):
+        self.txn_hash = txn_hash
+        self.timestamp = timestamp
+
+        self.token_in = None
+        self.token_in_symbol = None
+        self.token_in_decimals = None
+        self.amount_in = 0
+
+        self.token_out = None
+        self.token_out_symbol = None
+        self.token_out_decimals = None
+        self.amount_out = 0
@@ -0,0 +1,38 @@
+class TokenInfo:
+    def __init__(self, address: str, symbol: str = None, decimals: int = None, pair_address: str = None,
+                 approved_owners: list = None):
+        self.address = address
+        self.symbol = symbol
+        self.decimals = decimals
+        self.pair_address = pair_address
+
+        # Wallet addresses that have approved the router to spend this token
+        self.approved_owners = set(owner.lower() for owner in approved_owners or [])
+
+    def is_complete(self) -> bool:
+        return self.symbol is not None and self.decimals is not None and self.pair_address is not None
+
+    def merge(self, other: 'TokenInfo'):
+        """
+        Fills fields still unknown here from another copy of the same token
+        and adds its approving owners
+        """
+        for field in ('symbol', 'decimals', 'pair_address'):
+            if getattr(self, field) is None:
+                setattr(self, field, getattr(other, field))
+
+        self.approved_owners |= other.approved_owners
+
+    def to_dict(self) -> dict:
+        return {
+            'address': self.address,
+            'symbol': self.symbol,
+            'decimals': self.decimals,
+            'pair_address': self.pair_address,
+            'approved_owners': sorted(self.approved_owners),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TokenInfo':
+        return cls(data.get('address'), data.get('symbol'), data.get('decimals'), data.get('pair_address'),
+                   data.get('approved_owners'))
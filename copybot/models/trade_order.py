@@ -1,3 +1,10 @@
+import struct
+
+
+# order type, token decimals, token address, token symbol (utf-8, zero padded)
+_PACKED_FORMAT = struct.Struct("!BB20s16s")
+_ORDER_TYPES = ('BUY', 'SELL')
+
 
 class TradeOrder:
     def __init__(self, order_type: str, token_symbol: str, contract_address: str, token_decimals: int):
@@ -5,3 +12,16 @@ class TradeOrder:
         self.token_symbol = token_symbol
         self.contract_address = contract_address
         self.token_decimals = token_decimals
+
+    def to_bytes(self) -> bytes:
+        """
+        Compact fixed size encoding for passing orders between processes
+        """
+        return _PACKED_FORMAT.pack(_ORDER_TYPES.index(self.order_type), int(self.token_decimals),
+                                   bytes.fromhex(self.contract_address[2:]), str(self.token_symbol).encode('utf-8')[:16])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TradeOrder':
+        order_type, decimals, address, symbol = _PACKED_FORMAT.unpack(data)
+
+        return cls(_ORDER_TYPES[order_type], symbol.rstrip(b'\x00').decode('utf-8', errors='ignore'), f"0x{address.hex()}", decimals)
@@ -0,0 +1,50 @@
+import logging
+
+from network.transport import HttpTransport
+from utils.exceptions import BscScanError
+
+
+logger = logging.getLogger(__name__)
+
+
+BSCSCAN_API_URL = 'https://api.bscscan.com/api'
+
+
+class BscScanClient:
+    """
+    Minimal bscscan.com API client for the endpoints the bot uses, sending
+    requests through the shared HttpTransport.
+    """
+    def __init__(self, api_key: str, transport: HttpTransport, url: str = BSCSCAN_API_URL) -> None:
+        self.api_key = api_key
+        self.transport = transport
+        self.url = url
+
+    def _get(self, params: dict) -> list:
+        params = {key: value for key, value in params.items() if value is not None}
+        params['apikey'] = self.api_key
+
+        response = self.transport.get(self.url, params=params)
+        response.raise_for_status()
+        payload = response.json()
+
+        if str(payload.get('status')) != '1':
+            # An empty history is reported as an error by the API
+            if payload.get('message', '').startswith('No transactions found'):
+                return []
+            raise BscScanError(payload.get('message'), payload.get('result'))
+
+        return payload.get('result')
+
+    def get_bep20_token_transfer_events_by_address(self, address: str, startblock: int = None, endblock: int = None, sort: str = 'asc',
+                                                   page: int = None, offset: int = None) -> list:
+        return self._get({
+            'module': 'account',
+            'action': 'tokentx',
+            'address': address,
+            'startblock': startblock,
+            'endblock': endblock,
+            'sort': sort,
+            'page': page,
+            'offset': offset,
+        })
@@ -0,0 +1,40 @@
+import logging
+
+from web3 import Web3
+from typing import Optional
+from utils import utils
+
+
+logger = logging.getLogger(__name__)
+
+
+# Multicall3 is deployed at the same address on BSC mainnet and most EVM chains
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+
+
+class Multicall:
+    """
+    Batches many read-only contract calls into a single eth_call through the
+    Multicall3 contract.
+    """
+    def __init__(self, w3: Web3, address: str = MULTICALL3_ADDRESS, batch_size: int = 500) -> None:
+        self.w3 = w3
+        self.batch_size = batch_size
+        self.contract = utils.load_contract("multicall3", Web3.toChecksumAddress(address), w3, "multicall")
+
+    def aggregate(self, calls: list, block_identifier: Optional[int] = None) -> list:
+        """
+        Executes calls given as (target address, calldata) pairs. Returns a
+        (success, return data) pair per call, in the same order. Failing calls
+        do not fail the batch.
+        """
+        results = []
+        block_identifier = 'latest' if block_identifier is None else block_identifier
+
+        for start in range(0, len(calls), self.batch_size):
+            batch = [(target, True, calldata) for target, calldata in calls[start:start + self.batch_size]]
+            results.extend(self.contract.functions.aggregate3(batch).call(block_identifier=block_identifier))
+
+        logger.debug(f"Multicall executed {len(calls)} calls in batches of {self.batch_size}")
+
+        return [(bool(success), bytes(data)) for success, data in results]
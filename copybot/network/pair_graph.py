@@ -0,0 +1,142 @@
+import time
+
+from typing import Optional
+
+
+# Pancakeswap v2 charges 0.25% per hop
+FEE_NUMERATOR = 9975
+FEE_DENOMINATOR = 10000
+
+
+def get_amount_out(amount_in: int, reserve_in: int, reserve_out: int) -> int:
+    """
+    Constant product output amount for a single hop, identical to the
+    router's getAmountOut.
+    """
+    if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+        return 0
+
+    amount_in_with_fee = amount_in * FEE_NUMERATOR
+    numerator = amount_in_with_fee * reserve_out
+    denominator = reserve_in * FEE_DENOMINATOR + amount_in_with_fee
+
+    return numerator // denominator
+
+
+class PairGraph:
+    """
+    In-memory graph of Pancakeswap pairs. Nodes are token addresses and each
+    edge is a pair with its cached reserves, so candidate routes can be
+    searched and quoted locally without calling the router.
+    """
+    def __init__(self, reserves_ttl: float = 3.0):
+        self.reserves_ttl = reserves_ttl
+
+        # token -> {neighbour token: pair address}, tokens keyed lowercase
+        self.adjacency = {}
+
+        # pair address -> [token0, token1, reserve0, reserve1, updated_at]
+        self.pairs = {}
+
+        # lowercase token -> address as originally given
+        self.tokens = {}
+
+    def _key(self, token: str) -> str:
+        key = token.lower()
+        self.tokens.setdefault(key, token)
+
+        return key
+
+    def add_pair(self, pair_address: str, token0: str, token1: str, reserve0: int = 0, reserve1: int = 0, updated_at: float = None):
+        key0, key1 = self._key(token0), self._key(token1)
+
+        self.adjacency.setdefault(key0, {})[key1] = pair_address
+        self.adjacency.setdefault(key1, {})[key0] = pair_address
+
+        updated_at = time.time() if updated_at is None else updated_at
+        self.pairs[pair_address] = [key0, key1, int(reserve0), int(reserve1), updated_at]
+
+    def set_reserves(self, pair_address: str, reserve0: int, reserve1: int, updated_at: float = None):
+        pair = self.pairs[pair_address]
+        pair[2], pair[3] = int(reserve0), int(reserve1)
+        pair[4] = time.time() if updated_at is None else updated_at
+
+    def has_token(self, token: str) -> bool:
+        return token.lower() in self.adjacency
+
+    def stale_pairs(self, paths: list, now: float = None) -> set:
+        """
+        Returns pair addresses along the given paths whose reserves are older than the TTL
+        """
+        now = time.time() if now is None else now
+        stale = set()
+
+        for path in paths:
+            for pair_address in self.path_pairs(path):
+                if now - self.pairs[pair_address][4] > self.reserves_ttl:
+                    stale.add(pair_address)
+
+        return stale
+
+    def path_pairs(self, path: list) -> list:
+        return [self.adjacency[path[i].lower()][path[i + 1].lower()] for i in range(len(path) - 1)]
+
+    def candidate_paths(self, token_in: str, token_out: str, max_hops: int = 3, hop_tokens: Optional[set] = None) -> list:
+        """
+        All simple paths of 1 to max_hops pairs between two tokens. When
+        hop_tokens is given, only those tokens may be intermediate hops.
+        """
+        start, end = token_in.lower(), token_out.lower()
+        if start not in self.adjacency or end not in self.adjacency:
+            return []
+
+        hop_keys = None if hop_tokens is None else set(token.lower() for token in hop_tokens)
+
+        paths = []
+        stack = [[start]]
+
+        while stack:
+            path = stack.pop()
+            for neighbour in self.adjacency[path[-1]]:
+                if neighbour == end:
+                    paths.append(path + [neighbour])
+                elif len(path) < max_hops and neighbour not in path and (hop_keys is None or neighbour in hop_keys):
+                    stack.append(path + [neighbour])
+
+        return [[self.tokens[token] for token in path] for path in paths]
+
+    def quote(self, path: list, amount_in: int) -> int:
+        """
+        Output amount of swapping amount_in along path using cached reserves
+        """
+        amount = amount_in
+
+        for i in range(len(path) - 1):
+            token_in = path[i].lower()
+            token0, _, reserve0, reserve1, _ = self.pairs[self.adjacency[token_in][path[i + 1].lower()]]
+
+            if token_in == token0:
+                amount = get_amount_out(amount, reserve0, reserve1)
+            else:
+                amount = get_amount_out(amount, reserve1, reserve0)
+
+            if amount == 0:
+                return 0
+
+        return amount
+
+    def best_path(self, token_in: str, token_out: str, amount_in: int, max_hops: int = 3, paths: Optional[list] = None) -> tuple:
+        """
+        Returns (path, amount_out) of the best output route, or (None, 0)
+        when the tokens are not connected
+        """
+        if paths is None:
+            paths = self.candidate_paths(token_in, token_out, max_hops)
+
+        best, best_amount = None, 0
+        for path in paths:
+            amount = self.quote(path, amount_in)
+            if amount > best_amount:
+                best, best_amount = path, amount
+
+        return best, best_amount
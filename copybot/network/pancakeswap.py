@@ -9,6 +9,9 @@ from web3.types import Any, Wei, ChecksumAddress, TxParams, Nonce, HexBytes
 from typing import Union, Optional
 from utils import utils
 from utils.exceptions import InsufficientBalance
+from network.route_finder import RouteFinder
+from network.swap_simulator import SwapSimulator
+from token_registry import TokenRegistry
 from eth_typing import AnyAddress
 from eth_utils import is_same_address
 
@@ -18,13 +21,20 @@ logger = logging.getLogger(__name__)
 
 class Pancakeswap:
     def __init__(self, address: Union[str, AnyAddress], private_key: str, provider: str = None, 
-        web3: Web3 = None, version:int = 2, max_slippage: float = 0.1) -> None:
+        web3: Web3 = None, version:int = 2, max_slippage: float = 0.1, approved_tokens: set = None,
+        route_finder: RouteFinder = None, token_registry: TokenRegistry = None, swap_simulator: SwapSimulator = None) -> None:
 
         self.address: AnyAddress = utils.str_to_addr(address) if isinstance(address, str) else address
         self.private_key = private_key
         self.version = version
         self.max_slippage = max_slippage
 
+        # Tokens already known to be approved for the router, shared with the caller's execution lane
+        self.approved_tokens = approved_tokens if approved_tokens is not None else set()
+        self.route_finder = route_finder
+        self.token_registry = token_registry
+        self.swap_simulator = swap_simulator
+
         if web3:
             self.w3 = web3
         else:
@@ -77,16 +87,18 @@ class Pancakeswap:
         if recipient is None:
             recipient = self.address
         
-        amount_out_min = int( (1 - self.max_slippage) * self.get_eth_token_input_price(output_token, qty) )
+        path = self._get_path(self.get_weth_address(), output_token, qty)
+        amount_out_min = int( (1 - self.max_slippage) * self.get_path_input_price(path, qty) )
         
         return self._build_and_send_tx(gwei, my_address, my_pk,
             self.router.functions.swapExactETHForTokens(
                 amount_out_min,
-                [self.get_weth_address(), output_token],
+                path,
                 recipient,
                 self._deadline(),
             ),
             self._get_tx_params(value=qty, gwei=gwei,my_address=my_address),
+            simulate=[(output_token, 'buy')],
         )
 
 
@@ -97,16 +109,18 @@ class Pancakeswap:
 
         if recipient is None:
             recipient = self.address
-        amount_out_min = int( (1 - self.max_slippage) * self.get_token_eth_input_price(input_token, qty) )
+        path = self._get_path(input_token, self.get_weth_address(), qty)
+        amount_out_min = int( (1 - self.max_slippage) * self.get_path_input_price(path, qty) )
         
         return self._build_and_send_tx(gwei, my_address,my_pk,
             self.router.functions.swapExactTokensForETHSupportingFeeOnTransferTokens(
                 qty,
                 amount_out_min,
-                [input_token, self.get_weth_address()],
+                path,
                 recipient,
                 self._deadline(),
-            )
+            ),
+            simulate=[(input_token, 'sell')],
         )
 
 
@@ -116,27 +130,41 @@ class Pancakeswap:
         if recipient is None:
             recipient = self.address
 
-        min_tokens_bought = int( (1 - self.max_slippage) * self.get_token_token_input_price(input_token, output_token, qty) )
-        
+        path = self._get_path(input_token, output_token, qty)
+        min_tokens_bought = int( (1 - self.max_slippage) * self.get_path_input_price(path, qty) )
+
+        # Taxed tokens break the router's per-hop amount checks, the fee tolerant variant works for both
         return self._build_and_send_tx(gwei, my_address,my_pk,
-            self.router.functions.swapExactTokensForTokens(
+            self.router.functions.swapExactTokensForTokensSupportingFeeOnTransferTokens(
                 qty,
                 min_tokens_bought,
-                [input_token, self.get_weth_address(), output_token],
+                path,
                 recipient,
                 self._deadline(),
             ),
+            simulate=[(input_token, 'sell'), (output_token, 'buy')],
         )
 
 
-    def _build_and_send_tx(self, gwei, my_address, my_pk, function: ContractFunction, tx_params: Optional[TxParams] = None) -> HexBytes:
+    def _build_and_send_tx(self, gwei, my_address, my_pk, function: ContractFunction, tx_params: Optional[TxParams] = None,
+        simulate: Optional[list] = None) -> HexBytes:
         if not tx_params:
             tx_params = self._get_tx_params(gwei,my_address)
         
         transaction = function.buildTransaction(tx_params)
+
+        # Simulations run on worker threads while we sign
+        simulation = None
+        if self.swap_simulator and simulate:
+            simulation = self.swap_simulator.start(transaction, [(utils.addr_to_str(token), side) for token, side in simulate])
+
         signed_txn = self.w3.eth.account.sign_transaction(
             transaction, private_key=my_pk
         )
+
+        if simulation:
+            self.swap_simulator.finish(simulation)
+
         try:
             return self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
         finally:
@@ -156,12 +184,42 @@ class Pancakeswap:
         }
 
 
+    def _get_path(self, input_token: AnyAddress, output_token: AnyAddress, qty: int) -> list:
+        """
+        Best output path from the route finder, falling back to the direct pair
+        or a hop through WBNB when no route finder is configured.
+        """
+        if self.route_finder:
+            path = self.route_finder.best_path(input_token, output_token, qty)
+            if path:
+                return path
+
+        if is_same_address(input_token, self.get_weth_address()) or is_same_address(output_token, self.get_weth_address()):
+            return [input_token, output_token]
+
+        return [input_token, self.get_weth_address(), output_token]
+
+
     def _deadline(self) -> int:
         return int(time.time()) + 10 * 60
 
 
+    def _set_approved(self, token: AnyAddress):
+        self.approved_tokens.add(utils.addr_to_str(token))
+
+        if self.token_registry:
+            self.token_registry.set_approved(utils.addr_to_str(token), utils.addr_to_str(self.address))
+
+
     def _is_approved(self, token: AnyAddress) -> bool:
         utils.validate_address(token)
+        if utils.addr_to_str(token) in self.approved_tokens:
+            return True
+
+        if self.token_registry and self.token_registry.is_approved(utils.addr_to_str(token), utils.addr_to_str(self.address)):
+            self.approved_tokens.add(utils.addr_to_str(token))
+            return True
+
         contract_addr = self.router_address_v2
         
         amount = (
@@ -171,6 +229,7 @@ class Pancakeswap:
         )
         
         if amount >= self.max_approval_check_int:
+            self._set_approved(token)
             return True
         else:
             return False
@@ -216,6 +275,12 @@ class Pancakeswap:
         return price
 
 
+    def get_path_input_price(self, path: list, qty: int) -> int:
+        price = self.router.functions.getAmountsOut(qty, path).call()[-1]
+
+        return price
+
+
     def get_token_token_input_price(self, token0: AnyAddress, token1: AnyAddress, qty: int) -> int:
         if is_same_address(token0, self.get_weth_address()):
             return int(self.get_eth_token_input_price(token1, qty))
@@ -261,5 +326,6 @@ class Pancakeswap:
         
         tx = self._build_and_send_approval(function)
         self.w3.eth.wait_for_transaction_receipt(tx, timeout=6000)
+        self._set_approved(token)
 
         time.sleep(1)
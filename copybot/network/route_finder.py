@@ -0,0 +1,135 @@
+import itertools
+import logging
+import threading
+
+from web3 import Web3
+from web3.contract import Contract
+from eth_abi import decode_single
+from typing import Optional
+from utils import utils
+from network.multicall import Multicall
+from network.pair_graph import PairGraph
+from eth_typing import AnyAddress
+
+
+logger = logging.getLogger(__name__)
+
+
+class RouteFinder:
+    """
+    Finds the best output swap path over a cached graph of Pancakeswap pairs
+    among the configured base tokens. Pair addresses are looked up once via
+    the factory, reserves are refreshed only when stale. Chain reads are
+    batched through Multicall3, so a route costs at most three eth_calls
+    however many pairs it touches.
+    """
+    def __init__(self, w3: Web3, factory: Contract, base_tokens: list, reserves_ttl: float = 3.0, max_hops: int = 3,
+                 multicall: Multicall = None) -> None:
+        self.w3 = w3
+        self.factory = factory
+        self.base_tokens = [Web3.toChecksumAddress(token) for token in base_tokens]
+        self.max_hops = max_hops
+        self.multicall = multicall or Multicall(w3)
+
+        # Any pair contract works for encoding, the target address is set per call
+        self.pair = utils.load_contract("pair", self.factory.address, w3, "pancakeswap")
+
+        self.graph = PairGraph(reserves_ttl=reserves_ttl)
+
+        # Tokens whose pairs against every base token have been looked up
+        self.connected_tokens = set()
+
+        # Lane worker threads share the finder, the graph must not change under a search
+        self._lock = threading.Lock()
+
+        self._build()
+
+    def _build(self):
+        """
+        Loads every pair between base tokens from the factory
+        """
+        self._add_pairs(list(itertools.combinations(self.base_tokens, 2)))
+
+        self.connected_tokens.update(token.lower() for token in self.base_tokens)
+
+        logger.info(f"Route graph built with {len(self.graph.pairs)} pairs among {len(self.base_tokens)} base tokens")
+
+    def _add_pairs(self, token_pairs: list):
+        """
+        Looks up the pair addresses of all token pairs in one multicall, then
+        the reserves of the existing ones in another
+        """
+        if not token_pairs:
+            return
+
+        calls = [(self.factory.address, self.factory.encodeABI(fn_name='getPair', args=[token_a, token_b]))
+                 for token_a, token_b in token_pairs]
+
+        found = []
+        for (token_a, token_b), (success, data) in zip(token_pairs, self.multicall.aggregate(calls)):
+            pair_address = decode_single('address', data) if success and data else None
+            if pair_address and int(pair_address, 16) != 0:
+                # The factory sorts pair tokens by address
+                token0, token1 = sorted((token_a, token_b), key=lambda token: int(token, 16))
+                found.append((Web3.toChecksumAddress(pair_address), token0, token1))
+
+        reserves = self._get_reserves([pair_address for pair_address, _, _ in found])
+
+        for pair_address, token0, token1 in found:
+            if pair_address in reserves:
+                self.graph.add_pair(pair_address, token0, token1, *reserves[pair_address])
+
+    def _get_reserves(self, pair_addresses: list) -> dict:
+        """
+        Returns pair address -> (reserve0, reserve1) for every pair read successfully
+        """
+        if not pair_addresses:
+            return {}
+
+        calldata = self.pair.encodeABI(fn_name='getReserves')
+        results = self.multicall.aggregate([(pair_address, calldata) for pair_address in pair_addresses])
+
+        reserves = {}
+        for pair_address, (success, data) in zip(pair_addresses, results):
+            if success and data:
+                reserve0, reserve1, _ = decode_single('(uint112,uint112,uint32)', data)
+                reserves[pair_address] = (reserve0, reserve1)
+
+        return reserves
+
+    def _connect_tokens(self, tokens: list):
+        """
+        Adds the pairs of non-base tokens against each base token to the graph
+        """
+        tokens = [token for token in dict.fromkeys(tokens) if token.lower() not in self.connected_tokens]
+
+        self._add_pairs([(token, base_token) for token in tokens for base_token in self.base_tokens])
+
+        self.connected_tokens.update(token.lower() for token in tokens)
+
+    def _refresh_reserves(self, paths: list):
+        for pair_address, (reserve0, reserve1) in self._get_reserves(list(self.graph.stale_pairs(paths))).items():
+            self.graph.set_reserves(pair_address, reserve0, reserve1)
+
+    def best_path(self, token_in: AnyAddress, token_out: AnyAddress, qty: int) -> Optional[list]:
+        """
+        Returns the path with the highest output for qty of token_in, or None
+        when no route exists in the graph
+        """
+        token_in, token_out = utils.addr_to_str(token_in), utils.addr_to_str(token_out)
+
+        with self._lock:
+            self._connect_tokens([token_in, token_out])
+
+            # Only base tokens are trusted as hops, earlier traded tokens may be taxed or thin
+            paths = self.graph.candidate_paths(token_in, token_out, self.max_hops, hop_tokens=self.base_tokens)
+            if not paths:
+                return None
+
+            self._refresh_reserves(paths)
+
+            path, amount_out = self.graph.best_path(token_in, token_out, qty, paths=paths)
+
+        logger.debug(f"Best route {path} out of {len(paths)} candidates, expected output {amount_out}")
+
+        return path
@@ -0,0 +1,198 @@
+import logging
+import statistics
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from web3 import Web3
+from web3.providers.base import JSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+from typing import Any
+from network.transport import HttpTransport
+
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointStats:
+    """
+    Rolling window of request latencies and outcomes for one endpoint
+    """
+    def __init__(self, url: str, window: int = 50) -> None:
+        self.url = url
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self.samples.append((latency, ok))
+
+    def error_rate(self) -> float:
+        with self._lock:
+            samples = list(self.samples)
+
+        if not samples:
+            return 0.0
+
+        return sum(1 for _, ok in samples if not ok) / len(samples)
+
+    def latency(self) -> float:
+        """
+        Median latency of successful requests. Untried endpoints report 0 so they get sampled.
+        """
+        with self._lock:
+            latencies = [latency for latency, ok in self.samples if ok]
+
+        return statistics.median(latencies) if latencies else (0.0 if not self.samples else float('inf'))
+
+    def is_healthy(self, max_error_rate: float) -> bool:
+        return self.error_rate() <= max_error_rate
+
+
+class MultiEndpointProvider(JSONBaseProvider):
+    """
+    Web3 provider over several JSON-RPC endpoints. Reads go to the fastest
+    healthy endpoint and are hedged: if no answer arrives within hedge_after
+    seconds the same request is also sent to the next endpoint, and the first
+    answer wins. Failed requests fail over immediately. Raw transactions are
+    broadcast to every endpoint at once.
+    """
+    BROADCAST_METHODS = {'eth_sendRawTransaction'}
+
+    def __init__(self, endpoint_uris: list, transport: HttpTransport = None, hedge_after: float = 0.25,
+                 window: int = 50, max_error_rate: float = 0.5) -> None:
+        super().__init__()
+
+        if not endpoint_uris:
+            raise ValueError("MultiEndpointProvider requires at least one endpoint")
+
+        self.endpoint_uris = list(endpoint_uris)
+        self.transport = transport or HttpTransport()
+        self.hedge_after = hedge_after
+        self.max_error_rate = max_error_rate
+
+        self.stats = {url: EndpointStats(url, window) for url in self.endpoint_uris}
+        self.executor = ThreadPoolExecutor(max_workers=4 * len(self.endpoint_uris), thread_name_prefix="rpc")
+
+    def __str__(self) -> str:
+        return f"MultiEndpointProvider({', '.join(self.endpoint_uris)})"
+
+    def _post(self, url: str, request_data: bytes) -> RPCResponse:
+        start = time.perf_counter()
+
+        try:
+            response = self.transport.post(url, data=request_data, headers={'Content-Type': 'application/json'})
+            response.raise_for_status()
+            rpc_response = self.decode_rpc_response(response.content)
+        except Exception:
+            self.stats[url].record(time.perf_counter() - start, False)
+            raise
+
+        # A JSON-RPC error (e.g. a revert) is a valid answer from a healthy node
+        self.stats[url].record(time.perf_counter() - start, True)
+
+        return rpc_response
+
+    def ranked_endpoints(self) -> list:
+        """
+        Healthy endpoints fastest first, followed by unhealthy ones as a last resort
+        """
+        healthy = [url for url in self.endpoint_uris if self.stats[url].is_healthy(self.max_error_rate)]
+        unhealthy = [url for url in self.endpoint_uris if url not in healthy]
+
+        return sorted(healthy, key=lambda url: self.stats[url].latency()) + \
+            sorted(unhealthy, key=lambda url: self.stats[url].error_rate())
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        request_data = self.encode_rpc_request(method, params)
+
+        if method in self.BROADCAST_METHODS:
+            return self._broadcast(method, request_data)
+
+        return self._hedged(method, request_data)
+
+    def _hedged(self, method: RPCEndpoint, request_data: bytes) -> RPCResponse:
+        pending_urls = self.ranked_endpoints()
+        in_flight = {}
+        last_error = None
+
+        while pending_urls or in_flight:
+            if pending_urls:
+                url = pending_urls.pop(0)
+                in_flight[self.executor.submit(self._post, url, request_data)] = url
+
+            # Wait for an answer, hedging to the next endpoint if it takes too long
+            timeout = self.hedge_after if pending_urls else None
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                url = in_flight.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning(f"{method} failed on {url}: {e}")
+                    last_error = e
+
+            if not done:
+                logger.debug(f"{method} slower than {self.hedge_after}s, hedging to {pending_urls[0]}")
+
+        raise last_error
+
+    def _broadcast(self, method: RPCEndpoint, request_data: bytes) -> RPCResponse:
+        futures = {self.executor.submit(self._post, url, request_data): url for url in self.endpoint_uris}
+
+        error_response, last_error = None, None
+        pending = set(futures)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    logger.warning(f"{method} failed on {futures[future]}: {e}")
+                    last_error = e
+                    continue
+
+                # Other nodes may answer 'already known' once one has the transaction
+                if 'error' not in response:
+                    return response
+                error_response = error_response or response
+
+        if error_response:
+            return error_response
+
+        raise last_error
+
+    def isConnected(self) -> bool:
+        try:
+            return 'result' in self.make_request(RPCEndpoint('web3_clientVersion'), [])
+        except Exception:
+            return False
+
+    def endpoint_report(self) -> dict:
+        return {
+            url: {'latency': stats.latency(), 'error_rate': stats.error_rate(), 'healthy': stats.is_healthy(self.max_error_rate)}
+            for url, stats in self.stats.items()
+        }
+
+    def log_endpoint_report(self):
+        for url, report in self.endpoint_report().items():
+            logger.info(f"{url}: latency={report['latency'] * 1000:.1f}ms error_rate={report['error_rate']:.0%} healthy={report['healthy']}")
+
+
+def provider_from_config(config: dict, transport: HttpTransport) -> JSONBaseProvider:
+    """
+    MultiEndpointProvider over 'chain_urls' when configured, otherwise an
+    HTTPProvider for 'chain_url'. Both use the pooled sessions of transport.
+    """
+    chain_urls = config.get('chain_urls') or []
+
+    if chain_urls:
+        return MultiEndpointProvider(chain_urls, transport, hedge_after=float(config.get('rpc_hedge_after', 0.25)))
+
+    chain_url = config.get('chain_url')
+
+    return Web3.HTTPProvider(chain_url, request_kwargs={'timeout': transport.timeout}, session=transport.session(chain_url))
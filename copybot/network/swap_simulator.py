@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+from web3.types import TxParams
+from typing import Optional
+from utils.exceptions import SwapSimulationFailed
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_revert_error(error: ValueError) -> bool:
+    data = error.args[0] if error.args else None
+
+    if isinstance(data, dict):
+        return data.get('code') == 3 or 'revert' in str(data.get('message', '')).lower()
+
+    return 'revert' in str(error).lower()
+
+
+class TokenVerdict:
+    def __init__(self, ok: bool, reason: str = None, checked_at: float = None):
+        self.ok = ok
+        self.reason = reason
+        self.checked_at = time.time() if checked_at is None else checked_at
+
+
+class VerdictCache:
+    """
+    Per token buyable/sellable verdicts from swap simulations, valid for ttl
+    seconds. Shared by all lanes so a token is only simulated once per TTL.
+    """
+    def __init__(self, ttl: float = 600):
+        self.ttl = ttl
+
+        # (lowercase token, 'buy' | 'sell') -> TokenVerdict
+        self.verdicts = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str, side: str) -> Optional[TokenVerdict]:
+        with self._lock:
+            verdict = self.verdicts.get((token.lower(), side))
+
+        if verdict is None or time.time() - verdict.checked_at > self.ttl:
+            return None
+
+        return verdict
+
+    def record(self, token: str, side: str, ok: bool, reason: str = None):
+        with self._lock:
+            self.verdicts[(token.lower(), side)] = TokenVerdict(ok, reason)
+
+
+class Simulation:
+    def __init__(self, future: Future, checks: list):
+        self.future = future
+        self.checks = checks
+
+
+class SwapSimulator:
+    """
+    Runs an eth_call of the exact router transaction on a worker thread, so
+    it overlaps with signing instead of adding serial latency. Tokens with a
+    fresh good verdict skip the simulation, tokens with a fresh bad verdict
+    fail without touching the chain.
+    """
+    def __init__(self, w3: Web3, cache: VerdictCache, max_workers: int = 4) -> None:
+        self.w3 = w3
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="simulate")
+
+    def submit(self, transaction: TxParams) -> Future:
+        call = {key: transaction[key] for key in ('from', 'to', 'data', 'value', 'gas', 'gasPrice') if key in transaction}
+
+        return self.executor.submit(self.w3.eth.call, call)
+
+    def start(self, transaction: TxParams, checks: list) -> Optional[Simulation]:
+        """
+        checks are the (token, side) pairs the transaction exercises. Returns
+        None when every check already has a good verdict.
+        """
+        unknown = []
+        for token, side in checks:
+            verdict = self.cache.get(token, side)
+            if verdict is None:
+                unknown.append((token, side))
+            elif not verdict.ok:
+                raise SwapSimulationFailed(token, side, f"cached verdict: {verdict.reason}")
+
+        if not unknown:
+            return None
+
+        return Simulation(self.submit(transaction), unknown)
+
+    def reverted(self, future: Future) -> Optional[str]:
+        """
+        Revert reason of a simulation, None when it succeeded. Errors that
+        are not reverts (e.g. timeouts, rate limits) are raised.
+        """
+        try:
+            future.result()
+        except ContractLogicError as e:
+            return str(e)
+        except ValueError as e:
+            # web3 5 raises every JSON-RPC error response as ValueError({'code': ..., 'message': ...}),
+            # only code 3 or a message mentioning the revert is the swap itself failing
+            if not is_revert_error(e):
+                raise
+            return str(e)
+
+        return None
+
+    def finish(self, simulation: Simulation):
+        """
+        Records the verdicts of a simulation and raises SwapSimulationFailed if it reverted
+        """
+        try:
+            reason = self.reverted(simulation.future)
+        except Exception as e:
+            # No verdict from an infrastructure failure, the trade goes ahead
+            logger.warning(f"Swap simulation could not run: {e}")
+            return
+
+        if reason is None:
+            for token, side in simulation.checks:
+                self.cache.record(token, side, True)
+            return
+
+        # A revert can only be pinned on a token when it was the one unknown
+        # token in the swap, otherwise the trade fails without a verdict
+        if len(simulation.checks) == 1:
+            token, side = simulation.checks[0]
+            self.cache.record(token, side, False, reason)
+            raise SwapSimulationFailed(token, side, reason)
+
+        raise SwapSimulationFailed(" -> ".join(token for token, _ in simulation.checks), "swap", reason)
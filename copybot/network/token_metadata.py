@@ -0,0 +1,57 @@
+import logging
+
+from web3 import Web3
+from eth_abi import decode_single
+from utils import utils
+from network.multicall import Multicall
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenMetadataFetcher:
+    """
+    Fetches decimals, symbol and the WBNB pair address of many tokens in one
+    multicall, for lazily filling the TokenRegistry.
+    """
+    def __init__(self, w3: Web3, factory_address: str, weth_address: str, multicall: Multicall = None) -> None:
+        self.w3 = w3
+        self.factory_address = Web3.toChecksumAddress(factory_address)
+        self.weth_address = Web3.toChecksumAddress(weth_address)
+        self.multicall = multicall or Multicall(w3)
+
+        # Any ERC20 contract works for encoding, the target address is set per call
+        self.erc20 = utils.load_contract("erc20", self.weth_address, w3, "pancakeswap")
+        self.factory = utils.load_contract("factory", self.factory_address, w3, "pancakeswap")
+
+    def fetch(self, addresses: list) -> dict:
+        calls = []
+        for address in addresses:
+            token = Web3.toChecksumAddress(address)
+            calls.append((token, self.erc20.encodeABI(fn_name='decimals')))
+            calls.append((token, self.erc20.encodeABI(fn_name='symbol')))
+            calls.append((self.factory_address, self.factory.encodeABI(fn_name='getPair', args=[token, self.weth_address])))
+
+        results = self.multicall.aggregate(calls)
+
+        fetched = {}
+        for i, address in enumerate(addresses):
+            (decimals_ok, decimals), (symbol_ok, symbol), (pair_ok, pair) = results[3 * i:3 * i + 3]
+
+            fetched[address] = {
+                'address': Web3.toChecksumAddress(address),
+                'decimals': decode_single('uint8', decimals) if decimals_ok and decimals else None,
+                'symbol': self._decode_symbol(symbol) if symbol_ok and symbol else None,
+                'pair_address': decode_single('address', pair) if pair_ok and pair else None,
+            }
+
+        logger.debug(f"Fetched metadata for {len(addresses)} tokens")
+
+        return fetched
+
+    def _decode_symbol(self, data: bytes) -> str:
+        # Some older tokens return symbol as bytes32 instead of string
+        try:
+            return decode_single('string', data)
+        except Exception:
+            return decode_single('bytes32', data).rstrip(b'\x00').decode('utf-8', errors='ignore')
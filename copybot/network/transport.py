@@ -0,0 +1,143 @@
+import logging
+import threading
+
+import requests
+
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+
+logger = logging.getLogger(__name__)
+
+
+class HttpTransport:
+    """
+    Pooled, persistent HTTP sessions shared by every client the bot talks to
+    (Web3, BscScan and the Binance price API). One session per host keeps
+    TCP/TLS connections alive between requests, and every request gets the
+    configured connect/read timeouts.
+
+    HTTP/2 is optional and only used for plain get/post calls when httpx and
+    h2 are installed; Web3 always goes through requests.
+    """
+    def __init__(self, connect_timeout: float = 3.05, read_timeout: float = 10, pool_size: int = 10, http2: bool = False) -> None:
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.http2 = http2 and self._http2_available()
+
+        # host -> requests.Session / httpx.Client
+        self.sessions = {}
+        self.http2_clients = {}
+        self.http2_requests = {}
+
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'HttpTransport':
+        return cls(
+            connect_timeout=float(config.get('http_connect_timeout', 3.05)),
+            read_timeout=float(config.get('http_read_timeout', 10)),
+            pool_size=int(config.get('http_pool_size', 10)),
+            http2=bool(int(config.get('http2', 0))),
+        )
+
+    def _http2_available(self) -> bool:
+        try:
+            import httpx
+            import h2
+        except ImportError:
+            logger.warning("HTTP/2 requested but httpx/h2 are not installed, using HTTP/1.1")
+            return False
+
+        return True
+
+    def _host(self, url: str) -> str:
+        parts = urlsplit(url)
+
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def session(self, url: str) -> requests.Session:
+        """
+        Returns the persistent session for the host of url
+        """
+        host = self._host(url)
+
+        with self._lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self.sessions[host] = session
+
+        return session
+
+    def _http2_client(self, url: str):
+        import httpx
+
+        host = self._host(url)
+
+        with self._lock:
+            client = self.http2_clients.get(host)
+            if client is None:
+                client = httpx.Client(http2=True, timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                                      limits=httpx.Limits(max_keepalive_connections=self.pool_size))
+                self.http2_clients[host] = client
+            self.http2_requests[host] = self.http2_requests.get(host, 0) + 1
+
+        return client
+
+    def request(self, method: str, url: str, **kwargs):
+        if self.http2:
+            return self._http2_client(url).request(method, url, **kwargs)
+
+        kwargs.setdefault('timeout', self.timeout)
+
+        return self.session(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Requests, new connections and connection reuse rate per host
+        """
+        stats = {}
+
+        for host, session in self.sessions.items():
+            requests_sent, connections = 0, 0
+
+            for adapter in set(session.adapters.values()):
+                for key in adapter.poolmanager.pools.keys():
+                    pool = adapter.poolmanager.pools[key]
+                    requests_sent += pool.num_requests
+                    connections += pool.num_connections
+
+            stats[host] = {
+                'requests': requests_sent,
+                'connections': connections,
+                'reuse_rate': 1 - connections / requests_sent if requests_sent else None,
+            }
+
+        # httpx does not expose connection counts
+        for host, requests_sent in self.http2_requests.items():
+            stats.setdefault(host, {'requests': 0, 'connections': None, 'reuse_rate': None})
+            stats[host]['requests'] += requests_sent
+
+        return stats
+
+    def log_stats(self):
+        for host, host_stats in self.stats().items():
+            reuse_rate = host_stats['reuse_rate']
+            reuse = f"{reuse_rate:.1%}" if reuse_rate is not None else "n/a"
+            logger.info(f"{host}: requests={host_stats['requests']} connections={host_stats['connections']} reuse={reuse}")
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+        for client in self.http2_clients.values():
+            client.close()
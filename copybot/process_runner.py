@@ -0,0 +1,226 @@
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+import zlib
+
+from models.trade_order import TradeOrder
+
+
+logger = logging.getLogger(__name__)
+
+
+def executor_index(contract_address: str, executor_count: int) -> int:
+    """
+    Stable token -> executor mapping, so every order for a token reaches the
+    executor (and therefore the wallet lane) that bought it. Python's hash()
+    is randomized per process and can't be used here.
+    """
+    return zlib.crc32(contract_address.lower().encode()) % executor_count
+
+
+def ignore_interrupts():
+    """
+    Ctrl+C reaches every process of the group. Children ignore it so an
+    order is never cut off halfway, the supervisor drives their shutdown.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class QueueBot:
+    """
+    Stands in for CopyBot inside watcher processes: trade orders are encoded
+    and handed to the executor queue that owns the token instead of being
+    executed. Orders are reported as sent once queued.
+    """
+    def __init__(self, order_queues: list, token_registry, transport, position_snapshotter=None):
+        self.order_queues = order_queues
+        self.token_registry = token_registry
+        self.transport = transport
+        self.position_snapshotter = position_snapshotter
+
+    def get_position_snapshotter(self):
+        return self.position_snapshotter
+
+    def process_trade_order(self, trade_order: TradeOrder) -> bool:
+        index = executor_index(trade_order.contract_address, len(self.order_queues))
+        self.order_queues[index].put(trade_order.to_bytes())
+
+        return True
+
+
+def run_watcher(config_path: str, leader_addresses: list, order_queues: list, stop_event):
+    """
+    Watcher process entry point: polls BscScan for its leaders and queues
+    orders. The leaders share one position snapshotter.
+    """
+    ignore_interrupts()
+
+    from web3 import Web3
+    from bsc_trades import BscTrades, listen_to_leaders
+    from leader_positions import PositionSnapshotter
+    from network.multicall import Multicall
+    from network.rpc_provider import provider_from_config
+    from network.transport import HttpTransport
+    from token_registry import TokenRegistry
+    from utils.config import Configuration
+
+    config = dict(Configuration(config_path).get_config()['copybot'])
+    transport = HttpTransport.from_config(config)
+
+    w3 = Web3(provider_from_config(config, transport))
+
+    # Read-only copy, executors own writing the registry file
+    bot = QueueBot(order_queues, TokenRegistry.from_config(config, config_path), transport, PositionSnapshotter(w3, Multicall(w3)))
+
+    watchers = [BscTrades(bot=bot, path_to_config=config_path, address=leader_address) for leader_address in leader_addresses]
+    listen_to_leaders(watchers, stop_event=stop_event)
+
+
+def run_executor(config_path: str, index: int, executor_count: int, order_queue, stop_event):
+    """
+    Executor process entry point: executes the orders of its queue on its own
+    share of the wallet lanes
+    """
+    ignore_interrupts()
+
+    from copybot import CopyBot
+    from lane_pool import LanePool
+
+    bot = CopyBot(path_to_config=config_path)
+    bot.lane_pool = LanePool(bot.lane_pool.lanes[index::executor_count])
+
+    # A restarted executor must sell each token from the wallet that holds it
+    try:
+        bot.restore_open_tokens()
+    except Exception as e:
+        logger.warning(f"Executor {index} could not restore open tokens: {e}")
+
+    while not stop_event.is_set():
+        try:
+            data = order_queue.get(timeout=0.5)
+        except queue.Empty:
+            continue
+
+        # None is the shutdown sentinel
+        if data is None:
+            break
+
+        bot.process_trade_order(TradeOrder.from_bytes(data))
+
+    bot.stop()
+
+
+class ProcessSupervisor:
+    """
+    Runs watcher processes (one per leader by default) and executor processes
+    connected by one order queue per executor. Dead processes are restarted,
+    the queues outlive them so queued orders are not lost.
+    """
+    def __init__(self, config_path: str, leader_addresses: list, executor_count: int, wallet_count: int,
+                 watcher_count: int = None, watcher_target=run_watcher, executor_target=run_executor):
+        if executor_count > wallet_count:
+            raise ValueError(f"{executor_count} executors need at least as many wallets, only {wallet_count} configured")
+
+        watcher_count = min(watcher_count or len(leader_addresses), len(leader_addresses))
+
+        self.config_path = config_path
+        # Leaders are split round-robin, each watcher polls its group in turn
+        self.leader_groups = [leader_addresses[index::watcher_count] for index in range(watcher_count)]
+        self.executor_count = executor_count
+
+        self.watcher_target = watcher_target
+        self.executor_target = executor_target
+
+        self.stop_event = multiprocessing.Event()
+        self.order_queues = [multiprocessing.Queue() for _ in range(executor_count)]
+
+        self.watchers = {}
+        self.executors = {}
+        self.restarts = 0
+
+        self.shutdown_requested = False
+
+    def _start_watcher(self, index: int):
+        process = multiprocessing.Process(target=self.watcher_target, name=f"watcher-{index}",
+                                          args=(self.config_path, self.leader_groups[index], self.order_queues, self.stop_event))
+        process.start()
+        self.watchers[index] = process
+
+    def _start_executor(self, index: int):
+        process = multiprocessing.Process(target=self.executor_target, name=f"executor-{index}",
+                                          args=(self.config_path, index, self.executor_count, self.order_queues[index], self.stop_event))
+        process.start()
+        self.executors[index] = process
+
+    def start(self):
+        for index in range(self.executor_count):
+            self._start_executor(index)
+        for index in range(len(self.leader_groups)):
+            self._start_watcher(index)
+
+        logger.info(f"Started {len(self.watchers)} watcher and {len(self.executors)} executor processes")
+
+    def check_processes(self):
+        """
+        Restarts any process that exited while we are not shutting down
+        """
+        if self.stop_event.is_set():
+            return
+
+        for index, process in list(self.executors.items()):
+            if not process.is_alive():
+                logger.warning(f"{process.name} exited with code {process.exitcode}, restarting")
+                self.restarts += 1
+                self._start_executor(index)
+
+        for index, process in list(self.watchers.items()):
+            if not process.is_alive():
+                logger.warning(f"{process.name} exited with code {process.exitcode}, restarting")
+                self.restarts += 1
+                self._start_watcher(index)
+
+    def stop(self, timeout: float = 10):
+        """
+        Stops watchers first so no new orders arrive, then lets executors
+        finish the order they are on
+        """
+        self.stop_event.set()
+
+        for process in self.watchers.values():
+            process.join(timeout)
+
+        for order_queue in self.order_queues:
+            order_queue.put(None)
+
+        for process in list(self.watchers.values()) + list(self.executors.values()):
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"{process.name} did not stop in {timeout}s, terminating")
+                process.terminate()
+
+        logger.info("All processes stopped")
+
+    def request_shutdown(self, signum=None, frame=None):
+        logger.info(f"Received signal {signum}, shutting down")
+        self.shutdown_requested = True
+
+    def run_forever(self, check_interval: float = 1.0):
+        previous_sigterm = signal.signal(signal.SIGTERM, self.request_shutdown)
+        self.start()
+
+        try:
+            while not self.shutdown_requested:
+                time.sleep(check_interval)
+                self.check_processes()
+        except KeyboardInterrupt:
+            logger.info("Interrupted, shutting down")
+        finally:
+            # A second Ctrl+C must not cut the shutdown short
+            previous_sigint = signal.signal(signal.SIGINT, signal.SIG_IGN)
+            try:
+                self.stop()
+            finally:
+                signal.signal(signal.SIGINT, previous_sigint)
+                signal.signal(signal.SIGTERM, previous_sigterm)
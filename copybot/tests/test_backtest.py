@@ -0,0 +1,106 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backtest import Backtest, amount_out
+from network.pair_graph import get_amount_out
+
+
+LEADER = "0x94e3361495bd110114ac0b6e35ed75e77e6a6cfa"
+OTHER_LEADER = "0x0000000000000000000000000000000000000abc"
+POOL = "0x10ed43c718714eb63d5aa57b78b54704e256024e"
+TOKEN = "0x1af3f329e8be154074d8769d1ffa4ee058b1dbc3"
+OTHER = "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d"
+FEE_WALLET = "0x000000000000000000000000000000000000dead"
+
+ONE = 10 ** 18
+
+
+@pytest.fixture
+def transfers() -> dict:
+    """
+    LEADER buys TOKEN, sells 40% (below threshold), sells 60%, then buys again.
+    OTHER_LEADER only sells, which is never copied.
+    """
+    return {
+        'leader': np.array([LEADER, LEADER, LEADER, LEADER, OTHER_LEADER]),
+        'hash': np.array(["0x1", "0x2", "0x3", "0x4", "0x5"]),
+        'blockNumber': np.array([10, 20, 30, 40, 15], dtype=np.int64),
+        'from': np.array([POOL, LEADER, LEADER, POOL, OTHER_LEADER]),
+        'to': np.array([LEADER, POOL, POOL, LEADER, POOL]),
+        'contractAddress': np.array([TOKEN] * 5),
+        'value': np.array([100.0, 40.0, 60.0, 100.0, 10.0]),
+    }
+
+
+@pytest.fixture
+def reserves() -> dict:
+    """
+    TOKEN doubles in price between block 5 and block 25
+    """
+    return {
+        'token': np.array([TOKEN, TOKEN]),
+        'blockNumber': np.array([25, 5], dtype=np.int64),
+        'reserve_token': np.array([500000.0 * ONE, 1000000.0 * ONE]),
+        'reserve_bnb': np.array([2000.0 * ONE, 1000.0 * ONE]),
+    }
+
+
+class TestBacktest(object):
+
+    def test_amount_out_matches_router(self):
+        assert amount_out(np.array([1000.0]), np.array([10000.0]), np.array([10000.0]))[0] == pytest.approx(get_amount_out(1000, 10000, 10000), abs=1)
+
+    def test_signals_follow_copy_rules(self, transfers, reserves):
+        signals = Backtest(transfers, reserves).signals()
+
+        assert signals['row'].tolist() == [0, 2, 3]
+        assert signals['is_sell'].tolist() == [False, True, False]
+        assert signals['position'].tolist() == [0, 0, 1]
+        assert signals['position_count'] == 2
+
+    def test_transfers_are_netted_per_transaction(self, reserves):
+        # A taxed sell of 45 + 5 reaches the threshold only once netted, then
+        # a TOKEN to OTHER swap is both a SELL of TOKEN and a BUY of OTHER
+        transfers = {
+            'leader': np.array([LEADER] * 7),
+            'hash': np.array(["0x1", "0x2", "0x2", "0x3", "0x4", "0x4", "0x4"]),
+            'blockNumber': np.array([10, 20, 20, 30, 40, 40, 40], dtype=np.int64),
+            'from': np.array([POOL, LEADER, LEADER, POOL, LEADER, POOL, POOL]),
+            'to': np.array([LEADER, POOL, FEE_WALLET, LEADER, POOL, LEADER, POOL]),
+            'contractAddress': np.array([TOKEN, TOKEN, TOKEN, TOKEN, TOKEN, OTHER, TOKEN]),
+            'value': np.array([100.0, 45.0, 5.0, 80.0, 80.0, 30.0, 1.0]),
+        }
+
+        signals = Backtest(transfers, reserves).signals()
+
+        assert signals['row'].tolist() == [0, 1, 3, 4, 5]
+        assert signals['is_sell'].tolist() == [False, True, False, True, False]
+        assert signals['position'].tolist() == [0, 0, 1, 1, 2]
+
+    def test_pnl_per_leader(self, transfers, reserves):
+        backtest = Backtest(transfers, reserves, buy_amount_bnb=1, latencies=(0,))
+        results = {row['leader']: row for row in backtest.run()}
+
+        tokens = get_amount_out(ONE, 1000 * ONE, 1000000 * ONE)
+        first_trade = get_amount_out(tokens, 500000 * ONE, 2000 * ONE) - ONE
+        second_tokens = get_amount_out(ONE, 2000 * ONE, 500000 * ONE)
+        second_trade = get_amount_out(second_tokens, 500000 * ONE, 2000 * ONE) - ONE
+
+        assert results[LEADER]['positions'] == 2
+        assert results[LEADER]['closed'] == 1
+        assert results[LEADER]['pnl_bnb'] == pytest.approx((first_trade + second_trade) / ONE, rel=1e-9)
+        assert results[OTHER_LEADER]['positions'] == 0
+
+    def test_latency_changes_fill(self, transfers, reserves):
+        # With 20 blocks of latency the BUY at block 10 only fills after the price doubled
+        results = Backtest(transfers, reserves, buy_amount_bnb=1, latencies=(0, 20)).run()
+        curve = [row['pnl_bnb'] for row in results if row['leader'] == LEADER]
+
+        assert curve[0] > curve[1]
+
+    def test_requires_reserves(self, transfers):
+        empty = {'token': np.array([]), 'blockNumber': np.array([]), 'reserve_token': np.array([]), 'reserve_bnb': np.array([])}
+
+        with pytest.raises(ValueError):
+            Backtest(transfers, empty)
@@ -0,0 +1,274 @@
+import pytest
+
+from concurrent.futures import Future
+from bsc_trades import BscTrades
+from token_registry import TokenRegistry
+
+
+LEADER = "0x94e3361495bd110114ac0b6e35ed75e77e6a6cfa"
+TOKEN = "0x1af3f329e8be154074d8769d1ffa4ee058b1dbc3"
+OTHER = "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d"
+PAIR = "0x0ed7e52944161450477ee417de9cd3a859b14fd0"
+FEE_WALLET = "0x000000000000000000000000000000000000dead"
+
+CONFIG = """
+copybot: {{}}
+bsc_trades:
+  api_key: ""
+  listen_to_address: "{leader}"
+  check_freshness: 0
+  position_snapshots: {position_snapshots}
+  send_trade_orders: 1
+  send_sell_orders: 1
+  token_blacklist: {token_blacklist}
+"""
+
+
+class FakeSnapshotter:
+    """
+    Stands in for PositionSnapshotter with balances set per (leader, token)
+    """
+    def __init__(self):
+        self.block = 1
+        self.balances = {}
+        self.tracked = set()
+
+    def refresh(self) -> bool:
+        return True
+
+    def track(self, leader: str, token: str):
+        self.tracked.add((leader.lower(), token.lower()))
+
+    def untrack(self, leader: str, token: str):
+        self.tracked.discard((leader.lower(), token.lower()))
+
+    def balance(self, leader: str, token: str):
+        return self.balances.get((leader.lower(), token.lower()))
+
+
+class FakeBot:
+    """
+    Records trade orders and answers them with the configured results, a
+    bool or a Future like CopyBot with lane workers
+    """
+    def __init__(self, token_registry: TokenRegistry):
+        self.token_registry = token_registry
+        self.transport = None
+        self.position_snapshotter = FakeSnapshotter()
+        self.orders = []
+        self.result = True
+
+    def get_position_snapshotter(self) -> FakeSnapshotter:
+        return self.position_snapshotter
+
+    def process_trade_order(self, trade_order):
+        self.orders.append(trade_order)
+
+        return self.result
+
+
+@pytest.fixture
+def make_trades(tmp_path):
+    def make(position_snapshots: int = 0, token_blacklist: list = None) -> BscTrades:
+        path = tmp_path / "properties.yml"
+        path.write_text(CONFIG.format(leader=LEADER, position_snapshots=position_snapshots, token_blacklist=token_blacklist or []))
+
+        return BscTrades(bot=FakeBot(TokenRegistry(str(tmp_path / "token_registry.json"))), path_to_config=str(path))
+
+    return make
+
+
+def transfer(txn_hash: str, txn_from: str, txn_to: str, token: str, value: int, symbol: str = 'TKN') -> dict:
+    return {
+        'hash': txn_hash, 'timeStamp': '1620000000', 'from': txn_from, 'to': txn_to,
+        'contractAddress': token, 'value': str(value), 'tokenSymbol': symbol, 'tokenDecimal': '18',
+    }
+
+
+def orders(trades: BscTrades) -> list:
+    return [(order.order_type, order.contract_address) for order in trades.bot.orders]
+
+
+class TestProcessTransactions(object):
+
+    def test_buy_with_bnb(self, make_trades):
+        trades = make_trades()
+
+        trades._process_transactions([transfer("0x1", PAIR, LEADER, TOKEN, 100)])
+
+        assert orders(trades) == [('BUY', TOKEN)]
+        assert trades.open_swaps[TOKEN] == 100
+
+    def test_taxed_sell_is_one_full_sell(self, make_trades):
+        trades = make_trades()
+        trades.open_swaps[TOKEN] = 100
+
+        # 90 + 10 tax is all of the position, neither transfer alone would be
+        trades._process_transactions([
+            transfer("0x2", LEADER, PAIR, TOKEN, 90),
+            transfer("0x2", LEADER, FEE_WALLET, TOKEN, 10),
+        ])
+
+        assert orders(trades) == [('SELL', TOKEN)]
+        assert TOKEN not in trades.open_swaps
+
+    def test_token_to_token_swap_sells_and_buys(self, make_trades):
+        trades = make_trades()
+        trades.open_swaps[TOKEN] = 100
+
+        trades._process_transactions([
+            transfer("0x3", LEADER, PAIR, TOKEN, 100),
+            transfer("0x3", PAIR, LEADER, OTHER, 40, 'USDC'),
+        ])
+
+        assert orders(trades) == [('SELL', TOKEN), ('BUY', OTHER)]
+        assert list(trades.open_swaps) == [OTHER]
+
+    def test_blacklist_applies_per_leg(self, make_trades):
+        trades = make_trades(token_blacklist=[OTHER])
+        trades.open_swaps[TOKEN] = 100
+
+        trades._process_transactions([
+            transfer("0x3", LEADER, PAIR, TOKEN, 100),
+            transfer("0x3", PAIR, LEADER, OTHER, 40, 'USDC'),
+        ])
+
+        assert orders(trades) == [('SELL', TOKEN)]
+
+    def test_transaction_is_seen_before_the_order_is_sent(self, make_trades):
+        trades = make_trades()
+        trades.bot.result = False
+
+        # A failed order is not retried when the next poll returns the same transaction
+        trades._process_transactions([transfer("0x1", PAIR, LEADER, TOKEN, 100)])
+        trades._process_transactions([transfer("0x1", PAIR, LEADER, TOKEN, 100)])
+
+        assert orders(trades) == [('BUY', TOKEN)]
+        assert TOKEN not in trades.open_swaps
+
+
+class TestQueuedOrders(object):
+
+    def test_queued_buy_opens_position_only_when_it_succeeds(self, make_trades):
+        trades = make_trades(position_snapshots=1)
+        future = trades.bot.result = Future()
+
+        trades._process_transactions([transfer("0x1", "0xpair", LEADER, TOKEN, 100)])
+
+        assert TOKEN not in trades.open_swaps
+        assert TOKEN in trades.pending_orders
+
+        future.set_result(True)
+        trades._collect_results()
+
+        assert trades.open_swaps[TOKEN] == 100
+        assert (LEADER, TOKEN) in trades.bot.position_snapshotter.tracked
+        assert not trades.pending_orders
+
+    def test_failed_queued_buy_opens_nothing(self, make_trades):
+        trades = make_trades()
+        future = trades.bot.result = Future()
+
+        trades._process_transactions([transfer("0x1", "0xpair", LEADER, TOKEN, 100)])
+        future.set_exception(RuntimeError("node down"))
+        trades._collect_results()
+
+        assert TOKEN not in trades.open_swaps
+
+    def test_no_second_buy_while_first_is_queued(self, make_trades):
+        trades = make_trades()
+        trades.bot.result = Future()
+
+        trades._process_transactions([transfer("0x1", "0xpair", LEADER, TOKEN, 100)])
+        trades._process_transactions([transfer("0x2", "0xpair", LEADER, TOKEN, 50)])
+
+        assert len(trades.bot.orders) == 1
+
+    def test_failed_queued_sell_keeps_position(self, make_trades):
+        trades = make_trades(position_snapshots=1)
+        trades.open_swaps[TOKEN] = 100
+        trades.bot.position_snapshotter.balances[(LEADER, TOKEN)] = 0
+        future = trades.bot.result = Future()
+
+        trades._check_exits()
+        future.set_result(False)
+        trades._collect_results()
+
+        assert trades.open_swaps[TOKEN] == 100
+        assert trades.failed_exits[TOKEN] == (1, 1)
+
+
+class TestPositionExits(object):
+
+    @pytest.fixture
+    def trades(self, make_trades) -> BscTrades:
+        trades = make_trades(position_snapshots=1)
+        trades.open_swaps[TOKEN] = 100
+        trades.bot.position_snapshotter.track(LEADER, TOKEN)
+
+        return trades
+
+    def set_balance(self, trades: BscTrades, balance: int, block: int = None):
+        positions = trades.bot.position_snapshotter
+        positions.balances[(LEADER, TOKEN)] = balance
+        if block is not None:
+            positions.block = block
+
+    def test_split_sell_crossing_threshold(self, trades: BscTrades):
+        self.set_balance(trades, 70)
+        trades._check_exits()
+        assert not trades.bot.orders
+
+        self.set_balance(trades, 50)
+        trades._check_exits()
+
+        assert [order.order_type for order in trades.bot.orders] == ['SELL']
+        assert TOKEN not in trades.open_swaps
+
+    def test_extra_buy_raises_position(self, trades: BscTrades):
+        self.set_balance(trades, 300)
+        trades._check_exits()
+
+        assert trades.open_swaps[TOKEN] == 300
+
+        # Half of the original 100 is only a sixth of the grown position
+        self.set_balance(trades, 250)
+        trades._check_exits()
+        assert not trades.bot.orders
+
+        self.set_balance(trades, 150)
+        trades._check_exits()
+        assert len(trades.bot.orders) == 1
+
+    def test_failed_sell_backs_off(self, trades: BscTrades):
+        trades.bot.result = False
+        attempts = []
+
+        for block in range(1, 20):
+            self.set_balance(trades, 0, block)
+            for _ in range(3):
+                before = len(trades.bot.orders)
+                trades._check_exits()
+                if len(trades.bot.orders) > before:
+                    attempts.append(block)
+
+        assert attempts == [1, 2, 4, 8, 16]
+        assert trades.open_swaps[TOKEN] == 100
+
+    def test_failed_exit_cleared_when_leader_buys_back(self, trades: BscTrades):
+        trades.bot.result = False
+        self.set_balance(trades, 0)
+        trades._check_exits()
+
+        self.set_balance(trades, 100)
+        trades._check_exits()
+
+        assert TOKEN not in trades.failed_exits
+
+    def test_successful_sell_untracks(self, trades: BscTrades):
+        self.set_balance(trades, 0)
+        trades._check_exits()
+
+        assert (LEADER, TOKEN) not in trades.bot.position_snapshotter.tracked
+        assert TOKEN not in trades.failed_exits
+        assert TOKEN not in trades.open_swaps
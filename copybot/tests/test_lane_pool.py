@@ -0,0 +1,94 @@
+import pytest
+
+from lane_pool import LanePool
+from models.trade_order import TradeOrder
+
+
+TOKEN_A = "0x1af3f329e8be154074d8769d1ffa4ee058b1dbc3"
+TOKEN_B = "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d"
+
+
+@pytest.fixture
+def pool() -> LanePool:
+    """
+    Method that returns a pool of two execution wallets
+    """
+    config = {
+        'my_address': '0xmain',
+        'my_pk': 'main_pk',
+        'wallets': [
+            {'address': '0xlane0', 'pk': 'pk0'},
+            {'address': '0xlane1', 'pk': 'pk1'},
+        ]
+    }
+    return LanePool.from_config(config)
+
+
+def order(order_type: str, token: str) -> TradeOrder:
+    return TradeOrder(order_type, 'TKN', token, 18)
+
+
+class TestLanePool(object):
+
+    def test_falls_back_to_single_wallet(self):
+        pool = LanePool.from_config({'my_address': '0xmain', 'my_pk': 'main_pk'})
+
+        assert len(pool.lanes) == 1
+        assert pool.lanes[0].address == '0xmain'
+        assert pool.lanes[0].private_key == 'main_pk'
+
+    def test_new_tokens_spread_across_lanes(self, pool: LanePool):
+        lane_a = pool.lane_for(order('BUY', TOKEN_A))
+        pool.record_result(lane_a, order('BUY', TOKEN_A), True)
+
+        lane_b = pool.lane_for(order('BUY', TOKEN_B))
+
+        assert lane_a is not lane_b
+
+    def test_queued_buys_spread_across_lanes(self, pool: LanePool):
+        # No results recorded yet, as when lane workers are still executing
+        lane_a = pool.lane_for(order('BUY', TOKEN_A))
+        lane_b = pool.lane_for(order('BUY', TOKEN_B))
+
+        assert lane_a is not lane_b
+
+    def test_sell_is_sticky_to_buying_lane(self, pool: LanePool):
+        buy_lane = pool.lane_for(order('BUY', TOKEN_A))
+        pool.record_result(buy_lane, order('BUY', TOKEN_A), True)
+        pool.record_result(pool.lane_for(order('BUY', TOKEN_B)), order('BUY', TOKEN_B), True)
+
+        sell_lane = pool.lane_for(order('SELL', TOKEN_A.upper()))
+
+        assert sell_lane is buy_lane
+
+    def test_sell_releases_token(self, pool: LanePool):
+        lane = pool.lane_for(order('BUY', TOKEN_A))
+        pool.record_result(lane, order('BUY', TOKEN_A), True)
+        pool.record_result(lane, order('SELL', TOKEN_A), True)
+
+        assert TOKEN_A not in pool.token_lanes
+        assert not lane.open_tokens
+
+    def test_restored_token_sells_from_holding_lane(self, pool: LanePool):
+        # A restarted executor found TOKEN_A in the second wallet
+        pool.restore_open_token(pool.lanes[1], TOKEN_A.upper())
+
+        assert pool.lane_for(order('SELL', TOKEN_A)) is pool.lanes[1]
+        assert pool.lanes[1].open_tokens == {TOKEN_A}
+
+        # and counts it when spreading new tokens
+        assert pool.lane_for(order('BUY', TOKEN_B)) is pool.lanes[0]
+
+    def test_report_aggregates_lanes(self, pool: LanePool):
+        lane = pool.lane_for(order('BUY', TOKEN_A))
+        lane.bnb_balance = 1.5
+        pool.lanes[1].bnb_balance = 0.5
+        pool.record_result(lane, order('BUY', TOKEN_A), True)
+        pool.record_result(pool.lane_for(order('BUY', TOKEN_B)), order('BUY', TOKEN_B), False)
+
+        report = pool.report()
+
+        assert report['total_bnb_balance'] == 2.0
+        assert report['total_orders_sent'] == 1
+        assert report['total_orders_failed'] == 1
+        assert report['total_open_tokens'] == 1
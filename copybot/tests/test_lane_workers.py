@@ -0,0 +1,97 @@
+import pytest
+import threading
+
+from lane_workers import LaneWorkers
+from models.execution_lane import ExecutionLane
+from models.trade_order import TradeOrder
+
+
+TOKEN_A = "0x1af3f329e8be154074d8769d1ffa4ee058b1dbc3"
+TOKEN_B = "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d"
+
+
+class RecordingExecutor:
+    """
+    Records executed orders per lane. Lane 0 blocks until released.
+    """
+    def __init__(self):
+        self.executed = []
+        self.release = threading.Event()
+        self.lane_1_done = threading.Event()
+
+    def __call__(self, lane: ExecutionLane, trade_order: TradeOrder):
+        if lane.lane_id == 0:
+            self.release.wait(5)
+        self.executed.append((lane.lane_id, trade_order.order_type))
+        if lane.lane_id == 1:
+            self.lane_1_done.set()
+
+
+def lanes() -> list:
+    return [ExecutionLane(0, '0xlane0', 'pk0'), ExecutionLane(1, '0xlane1', 'pk1')]
+
+
+class TestLaneWorkers(object):
+
+    def test_stuck_lane_does_not_block_others(self):
+        execute = RecordingExecutor()
+        pool = lanes()
+        workers = LaneWorkers(pool, execute)
+
+        workers.submit(pool[0], TradeOrder('BUY', 'A', TOKEN_A, 18))
+        workers.submit(pool[1], TradeOrder('BUY', 'B', TOKEN_B, 18))
+
+        assert execute.lane_1_done.wait(5)
+        assert execute.executed == [(1, 'BUY')]
+
+        execute.release.set()
+        workers.stop()
+
+    def test_orders_of_a_lane_keep_their_order(self):
+        execute = RecordingExecutor()
+        execute.release.set()
+        pool = lanes()
+        workers = LaneWorkers(pool, execute)
+
+        workers.submit(pool[0], TradeOrder('BUY', 'A', TOKEN_A, 18))
+        workers.submit(pool[0], TradeOrder('SELL', 'A', TOKEN_A, 18))
+        workers.stop()
+
+        assert execute.executed == [(0, 'BUY'), (0, 'SELL')]
+
+    def test_failing_order_does_not_stop_the_lane(self):
+        executed = []
+
+        def execute(lane, trade_order):
+            if trade_order.order_type == 'BUY':
+                raise RuntimeError("node down")
+            executed.append(trade_order.order_type)
+
+        pool = lanes()
+        workers = LaneWorkers(pool, execute)
+
+        workers.submit(pool[0], TradeOrder('BUY', 'A', TOKEN_A, 18))
+        workers.submit(pool[0], TradeOrder('SELL', 'A', TOKEN_A, 18))
+        workers.stop()
+
+        assert executed == ['SELL']
+
+    def test_results_are_reported_through_futures(self):
+        def execute(lane, trade_order):
+            if trade_order.order_type == 'SELL':
+                raise RuntimeError("node down")
+            return lane.lane_id == 1
+
+        pool = lanes()
+        workers = LaneWorkers(pool, execute)
+
+        buy = workers.submit(pool[1], TradeOrder('BUY', 'B', TOKEN_B, 18))
+        failed_buy = workers.submit(pool[0], TradeOrder('BUY', 'A', TOKEN_A, 18))
+        sell = workers.submit(pool[0], TradeOrder('SELL', 'A', TOKEN_A, 18))
+
+        assert buy.result(5) is True
+        assert failed_buy.result(5) is False
+        with pytest.raises(RuntimeError):
+            sell.result(5)
+
+        workers.stop()
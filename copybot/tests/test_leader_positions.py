@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+from leader_positions import PositionSnapshotter, BALANCE_OF_SELECTOR
+
+
+LEADER = "0x94e3361495bd110114ac0b6e35ed75e77e6a6cfa"
+OTHER_LEADER = "0x0000000000000000000000000000000000000abc"
+TOKEN = "0x1af3f329e8be154074d8769d1ffa4ee058b1dbc3"
+OTHER_TOKEN = "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d"
+
+
+class FakeMulticall:
+    """
+    Answers balanceOf calls with the balances set per (token, holder)
+    """
+    def __init__(self):
+        self.balances = {}
+        self.aggregated = []
+
+    def aggregate(self, calls: list, block_identifier=None) -> list:
+        self.aggregated.append((len(calls), block_identifier))
+
+        results = []
+        for target, calldata in calls:
+            assert calldata[:4] == BALANCE_OF_SELECTOR
+            holder = "0x" + calldata[16:36].hex()
+            balance = self.balances.get((target.lower(), holder))
+            results.append((balance is not None, balance.to_bytes(32, 'big') if balance is not None else b""))
+
+        return results
+
+
+def snapshotter() -> PositionSnapshotter:
+    return PositionSnapshotter(SimpleNamespace(eth=SimpleNamespace(block_number=100)), FakeMulticall())
+
+
+class TestPositionSnapshotter(object):
+
+    def test_snapshot_all_pairs_in_one_batch(self):
+        positions = snapshotter()
+        positions.multicall.balances = {(TOKEN, LEADER): 500, (OTHER_TOKEN, OTHER_LEADER): 7}
+        positions.track(LEADER, TOKEN)
+        positions.track(OTHER_LEADER, OTHER_TOKEN)
+
+        assert positions.refresh()
+
+        assert positions.multicall.aggregated == [(2, 100)]
+        assert positions.balance(LEADER.upper(), TOKEN) == 500
+        assert positions.balance(OTHER_LEADER, OTHER_TOKEN) == 7
+
+    def test_refresh_once_per_block(self):
+        positions = snapshotter()
+        positions.track(LEADER, TOKEN)
+
+        assert positions.refresh()
+        assert not positions.refresh()
+
+        positions.w3.eth.block_number = 101
+        assert positions.refresh()
+        assert len(positions.multicall.aggregated) == 2
+
+    def test_failed_calls_have_no_balance(self):
+        positions = snapshotter()
+        positions.track(LEADER, TOKEN)
+        positions.refresh()
+
+        assert positions.balance(LEADER, TOKEN) is None
+
+    def test_untrack(self):
+        positions = snapshotter()
+        positions.multicall.balances = {(TOKEN, LEADER): 500}
+        positions.track(LEADER, TOKEN)
+        positions.refresh()
+        positions.untrack(LEADER, TOKEN)
+
+        assert positions.balance(LEADER, TOKEN) is None
+        assert not positions.calls
+
+    def test_thousands_of_pairs(self):
+        positions = snapshotter()
+        leaders = [f"0x{i:040x}" for i in range(1, 51)]
+        tokens = [f"0x{i + 10 ** 6:040x}" for i in range(100)]
+        for leader in leaders:
+            for token in tokens:
+                positions.track(leader, token)
+                positions.multicall.balances[(token, leader)] = 1
+
+        positions.refresh()
+
+        assert positions.multicall.aggregated == [(5000, 100)]
+        assert len(positions.balances) == 5000
@@ -0,0 +1,20 @@
+from models.trade_order import TradeOrder
+
+
+class TestTradeOrder(object):
+
+    def test_bytes_round_trip(self):
+        order = TradeOrder('SELL', 'CAKE', '0x0e09fabb73bd3ade0a17ecc321fd13a19e81ce82', 18)
+
+        decoded = TradeOrder.from_bytes(order.to_bytes())
+
+        assert len(order.to_bytes()) == 38
+        assert decoded.order_type == 'SELL'
+        assert decoded.token_symbol == 'CAKE'
+        assert decoded.contract_address == '0x0e09fabb73bd3ade0a17ecc321fd13a19e81ce82'
+        assert decoded.token_decimals == 18
+
+    def test_long_symbol_is_truncated(self):
+        order = TradeOrder('BUY', 'AVERYLONGTOKENSYMBOLNAME', '0x0e09fabb73bd3ade0a17ecc321fd13a19e81ce82', 9)
+
+        assert TradeOrder.from_bytes(order.to_bytes()).token_symbol == 'AVERYLONGTOKENSY'
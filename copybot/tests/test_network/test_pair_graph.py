@@ -0,0 +1,78 @@
+import pytest
+import time
+
+from network.pair_graph import PairGraph, get_amount_out
+
+
+WBNB = "0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c"
+BUSD = "0xe9e7CEA3DedcA5984780Bafc599bD69ADd087D56"
+USDT = "0x55d398326f99059fF775485246999027B3197955"
+TOKEN = "0x1af3f329e8be154074d8769d1ffa4ee058b1dbc3"
+
+ONE = 10 ** 18
+
+
+@pytest.fixture
+def graph() -> PairGraph:
+    """
+    Method that returns a graph where TOKEN is thinly traded against WBNB
+    but deep against BUSD.
+    """
+    graph = PairGraph(reserves_ttl=3)
+    graph.add_pair("0xpair_wbnb_busd", WBNB, BUSD, 1000 * ONE, 300000 * ONE)
+    graph.add_pair("0xpair_busd_usdt", BUSD, USDT, 1000000 * ONE, 1000000 * ONE)
+    graph.add_pair("0xpair_token_wbnb", TOKEN, WBNB, 1000 * ONE, 1 * ONE)
+    graph.add_pair("0xpair_token_busd", TOKEN, BUSD, 100000 * ONE, 30000 * ONE)
+    return graph
+
+
+class TestPairGraph(object):
+
+    def test_get_amount_out_matches_router(self):
+        # Values from PancakeLibrary.getAmountOut with a 0.25% fee
+        assert get_amount_out(1000, 10000, 10000) == 907
+        assert get_amount_out(0, 10000, 10000) == 0
+
+    def test_candidate_paths(self, graph: PairGraph):
+        paths = graph.candidate_paths(WBNB, TOKEN, max_hops=3)
+
+        assert [WBNB, TOKEN] in paths
+        assert [WBNB, BUSD, TOKEN] in paths
+        assert all(2 <= len(path) <= 4 for path in paths)
+
+    def test_candidate_paths_respects_max_hops(self, graph: PairGraph):
+        paths = graph.candidate_paths(USDT, TOKEN, max_hops=2)
+
+        assert paths == [[USDT, BUSD, TOKEN]]
+
+    def test_hops_limited_to_hop_tokens(self, graph: PairGraph):
+        other = "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d"
+        graph.add_pair("0xpair_other_wbnb", other, WBNB, 1000 * ONE, 1000 * ONE)
+        graph.add_pair("0xpair_other_token", other, TOKEN, 1000 * ONE, 1000 * ONE)
+
+        paths = graph.candidate_paths(WBNB, TOKEN, max_hops=3, hop_tokens={WBNB, BUSD, USDT})
+
+        assert [WBNB, TOKEN] in paths
+        assert all(other not in path for path in paths)
+
+    def test_unknown_token_has_no_paths(self, graph: PairGraph):
+        assert graph.candidate_paths(WBNB, "0x0000000000000000000000000000000000000001") == []
+
+    def test_best_path_prefers_liquid_route(self, graph: PairGraph):
+        path, amount_out = graph.best_path(WBNB, TOKEN, ONE)
+
+        assert path == [WBNB, BUSD, TOKEN]
+        assert amount_out == graph.quote([WBNB, BUSD, TOKEN], ONE)
+        assert amount_out > graph.quote([WBNB, TOKEN], ONE)
+
+    def test_quote_handles_reversed_pair_order(self, graph: PairGraph):
+        forward = graph.quote([TOKEN, BUSD], ONE)
+
+        assert forward == get_amount_out(ONE, 100000 * ONE, 30000 * ONE)
+
+    def test_stale_pairs(self, graph: PairGraph):
+        graph.set_reserves("0xpair_token_wbnb", 1000 * ONE, 1 * ONE, updated_at=0)
+
+        stale = graph.stale_pairs([[WBNB, TOKEN], [WBNB, BUSD, TOKEN]], now=time.time())
+
+        assert stale == {"0xpair_token_wbnb"}
@@ -0,0 +1,138 @@
+import threading
+import time
+
+from types import SimpleNamespace
+from eth_abi import encode_single
+from network.route_finder import RouteFinder
+
+
+WBNB = "0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c"
+BUSD = "0xe9e7CEA3DedcA5984780Bafc599bD69ADd087D56"
+USDT = "0x55d398326f99059fF775485246999027B3197955"
+TOKEN = "0x1AF3F329e8BE154074D8769D1FFa4eE058B1DBc3"
+OTHER = "0x8AC76a51cc950d9822D68b83fE1Ad97B32Cd580d"
+FACTORY = "0xcA143Ce32Fe78f1f7019d7d551a6402fC5350c73"
+
+ONE = 10 ** 18
+
+
+class FakeContract:
+    """
+    Encodes calls as (function name, args) so FakeChain can answer them
+    """
+    def __init__(self, address: str):
+        self.address = address
+
+    def encodeABI(self, fn_name: str, args: list = None):
+        return (fn_name, tuple(args or []))
+
+
+class FakeChain:
+    """
+    Multicall stand-in holding the pairs of a small Pancakeswap deployment
+    """
+    def __init__(self, reserves: dict):
+        # frozenset of the two lowercase tokens -> (pair address, reserve of the lower token, of the higher token)
+        self.pairs = {}
+        for i, ((token_a, token_b), (reserve_a, reserve_b)) in enumerate(reserves.items()):
+            if int(token_a, 16) > int(token_b, 16):
+                reserve_a, reserve_b = reserve_b, reserve_a
+            self.pairs[frozenset((token_a.lower(), token_b.lower()))] = (f"0x{i + 1:040x}", reserve_a, reserve_b)
+
+        self.batches = []
+
+    def aggregate(self, calls: list, block_identifier=None) -> list:
+        self.batches.append(len(calls))
+
+        results = []
+        for target, (fn_name, args) in calls:
+            if fn_name == 'getPair':
+                pair = self.pairs.get(frozenset(token.lower() for token in args))
+                results.append((True, encode_single('address', pair[0] if pair else "0x" + "00" * 20)))
+            else:
+                pair = next(pair for pair in self.pairs.values() if pair[0] == target.lower())
+                results.append((True, encode_single('(uint112,uint112,uint32)', (pair[1], pair[2], 0))))
+
+        return results
+
+
+def route_finder(chain: FakeChain) -> RouteFinder:
+    w3 = SimpleNamespace(eth=SimpleNamespace(contract=lambda address, abi: FakeContract(address)))
+
+    return RouteFinder(w3, FakeContract(FACTORY), [WBNB, BUSD, USDT], reserves_ttl=3, multicall=chain)
+
+
+class TestRouteFinder(object):
+
+    def test_best_path_uses_deepest_route(self):
+        chain = FakeChain({
+            (WBNB, BUSD): (1000 * ONE, 300000 * ONE),
+            (BUSD, USDT): (1000000 * ONE, 1000000 * ONE),
+            (TOKEN, WBNB): (1000 * ONE, 1 * ONE),
+            (TOKEN, BUSD): (100000 * ONE, 30000 * ONE),
+        })
+
+        path = route_finder(chain).best_path(WBNB, TOKEN, ONE // 10)
+
+        assert [token.lower() for token in path] == [WBNB.lower(), BUSD.lower(), TOKEN.lower()]
+
+    def test_chain_reads_are_batched(self):
+        chain = FakeChain({
+            (WBNB, BUSD): (1000 * ONE, 300000 * ONE),
+            (WBNB, USDT): (1000 * ONE, 300000 * ONE),
+            (TOKEN, WBNB): (1000 * ONE, 1 * ONE),
+            (TOKEN, BUSD): (100000 * ONE, 30000 * ONE),
+        })
+        finder = route_finder(chain)
+        chain.batches.clear()
+
+        # New token: one getPair batch and one getReserves batch
+        finder.best_path(WBNB, TOKEN, ONE)
+        assert chain.batches == [3, 2]
+
+        # Fresh reserves: no chain reads at all
+        chain.batches.clear()
+        finder.best_path(WBNB, TOKEN, ONE)
+        assert chain.batches == []
+
+        # Stale reserves: every pair on every candidate path in one batch
+        for pair in finder.graph.pairs.values():
+            pair[4] = time.time() - 10
+        finder.best_path(WBNB, TOKEN, ONE)
+        assert chain.batches == [3]
+
+    def test_earlier_traded_tokens_are_never_hops(self):
+        chain = FakeChain({
+            (WBNB, BUSD): (1000 * ONE, 300000 * ONE),
+            (OTHER, WBNB): (10 ** 6 * ONE, 10 ** 6 * ONE),
+            (OTHER, BUSD): (10 ** 6 * ONE, 10 ** 9 * ONE),
+            (TOKEN, BUSD): (100000 * ONE, 30000 * ONE),
+        })
+        finder = route_finder(chain)
+
+        # OTHER is connected by an earlier trade, its inflated reserves must not attract the route
+        finder.best_path(WBNB, OTHER, ONE)
+        path = finder.best_path(WBNB, TOKEN, ONE)
+
+        assert [token.lower() for token in path] == [WBNB.lower(), BUSD.lower(), TOKEN.lower()]
+
+    def test_concurrent_searches(self):
+        tokens = [f"0x{i:040x}" for i in range(1, 41)]
+        chain = FakeChain(dict([((WBNB, BUSD), (1000 * ONE, 300000 * ONE))] +
+                               [((token, BUSD), (1000 * ONE, 1000 * ONE)) for token in tokens]))
+        finder = route_finder(chain)
+        errors = []
+
+        def search(token):
+            try:
+                assert finder.best_path(WBNB, token, ONE)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=search, args=(token,)) for token in tokens]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
@@ -0,0 +1,151 @@
+import json
+import pytest
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from network.rpc_provider import MultiEndpointProvider, EndpointStats, provider_from_config
+from network.transport import HttpTransport
+
+
+class JsonRpcStandIn:
+    """
+    Local JSON-RPC endpoint that answers every method with a fixed result,
+    after an injectable delay or with an injectable HTTP failure.
+    """
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.methods = []
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stand_in.methods.append(request['method'])
+                time.sleep(stand_in.delay)
+
+                if stand_in.fail:
+                    body = b"unavailable"
+                    self.send_response(503)
+                else:
+                    body = json.dumps({"jsonrpc": "2.0", "id": request['id'], "result": stand_in.name}).encode()
+                    self.send_response(200)
+
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stand_ins():
+    """
+    Method that yields a factory for JSON-RPC stand-ins and shuts them down afterwards
+    """
+    created = []
+
+    def create(name: str, delay: float = 0.0, fail: bool = False) -> JsonRpcStandIn:
+        stand_in = JsonRpcStandIn(name, delay, fail)
+        created.append(stand_in)
+        return stand_in
+
+    yield create
+
+    for stand_in in created:
+        stand_in.close()
+
+
+class TestEndpointStats(object):
+
+    def test_rolling_window(self):
+        stats = EndpointStats("http://node", window=4)
+        for _ in range(4):
+            stats.record(0.5, False)
+        for _ in range(4):
+            stats.record(0.1, True)
+
+        assert stats.error_rate() == 0
+        assert stats.latency() == pytest.approx(0.1)
+        assert stats.is_healthy(0.5)
+
+    def test_untried_endpoint_is_preferred(self):
+        assert EndpointStats("http://node").latency() == 0.0
+
+
+class TestMultiEndpointProvider(object):
+
+    def test_read_goes_to_fastest_endpoint(self, stand_ins):
+        slow, fast = stand_ins("slow", delay=0.1), stand_ins("fast")
+        provider = MultiEndpointProvider([slow.url, fast.url], hedge_after=5)
+        provider.stats[slow.url].record(0.1, True)
+        provider.stats[fast.url].record(0.01, True)
+
+        assert provider.make_request("eth_blockNumber", [])['result'] == "fast"
+        assert slow.methods == []
+
+    def test_slow_read_is_hedged(self, stand_ins):
+        slow, backup = stand_ins("slow", delay=1.0), stand_ins("backup")
+        provider = MultiEndpointProvider([slow.url, backup.url], hedge_after=0.05)
+        provider.stats[backup.url].record(0.5, True)
+
+        start = time.perf_counter()
+        response = provider.make_request("eth_call", [])
+
+        assert response['result'] == "backup"
+        assert time.perf_counter() - start < 0.9
+        assert slow.methods == ["eth_call"]
+
+    def test_failed_read_fails_over(self, stand_ins):
+        broken, healthy = stand_ins("broken", fail=True), stand_ins("healthy")
+        provider = MultiEndpointProvider([broken.url, healthy.url], hedge_after=5)
+        provider.stats[healthy.url].record(0.5, True)
+
+        assert provider.make_request("eth_getBalance", [])['result'] == "healthy"
+        assert provider.stats[broken.url].error_rate() == 1.0
+        # The broken endpoint is now ranked last
+        assert provider.ranked_endpoints() == [healthy.url, broken.url]
+
+    def test_all_endpoints_failing_raises(self, stand_ins):
+        provider = MultiEndpointProvider([stand_ins("a", fail=True).url, stand_ins("b", fail=True).url], hedge_after=0.01)
+
+        with pytest.raises(Exception):
+            provider.make_request("eth_blockNumber", [])
+
+    def test_raw_transactions_are_broadcast(self, stand_ins):
+        nodes = [stand_ins("a"), stand_ins("b", delay=0.05), stand_ins("c", fail=True)]
+        provider = MultiEndpointProvider([node.url for node in nodes])
+
+        assert provider.make_request("eth_sendRawTransaction", ["0x00"])['result'] in ("a", "b")
+
+        time.sleep(0.2)
+        assert all(node.methods == ["eth_sendRawTransaction"] for node in nodes)
+
+
+class TestProviderFromConfig(object):
+
+    def test_chain_urls_use_all_endpoints(self):
+        provider = provider_from_config({'chain_url': "http://a", 'chain_urls': ["http://a", "http://b"]}, HttpTransport())
+
+        assert isinstance(provider, MultiEndpointProvider)
+        assert provider.endpoint_uris == ["http://a", "http://b"]
+
+    def test_single_chain_url(self):
+        provider = provider_from_config({'chain_url': "http://a", 'chain_urls': []}, HttpTransport())
+
+        assert not isinstance(provider, MultiEndpointProvider)
+        assert provider.endpoint_uri == "http://a"
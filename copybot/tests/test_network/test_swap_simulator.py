@@ -0,0 +1,126 @@
+import pytest
+import threading
+
+from types import SimpleNamespace
+from web3.exceptions import ContractLogicError
+from network.swap_simulator import SwapSimulator, VerdictCache
+from utils.exceptions import SwapSimulationFailed
+
+
+TOKEN = "0x1af3f329e8be154074d8769d1ffa4ee058b1dbc3"
+TRANSACTION = {"from": "0x01", "to": "0x02", "data": "0x", "value": 0, "gas": 250000, "gasPrice": 10, "nonce": 7}
+
+
+class FakeEth:
+    """
+    Stands in for w3.eth, reverting or succeeding every eth_call
+    """
+    def __init__(self, revert: bool = False):
+        self.revert = revert
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def call(self, transaction):
+        self.release.wait(5)
+        self.calls.append(transaction)
+        if self.revert:
+            raise ContractLogicError("execution reverted: TRANSFER_FAILED")
+        return b""
+
+
+def simulator(revert: bool = False, ttl: float = 600) -> SwapSimulator:
+    return SwapSimulator(SimpleNamespace(eth=FakeEth(revert)), VerdictCache(ttl=ttl))
+
+
+class TestSwapSimulator(object):
+
+    def test_successful_simulation_is_cached(self):
+        sim = simulator()
+
+        sim.finish(sim.start(TRANSACTION, [(TOKEN, 'buy')]))
+
+        assert sim.cache.get(TOKEN, 'buy').ok
+        # Known good tokens skip the simulation entirely
+        assert sim.start(TRANSACTION, [(TOKEN, 'buy')]) is None
+        assert len(sim.w3.eth.calls) == 1
+
+    def test_nonce_is_not_sent_with_the_call(self):
+        sim = simulator()
+
+        sim.finish(sim.start(TRANSACTION, [(TOKEN, 'buy')]))
+
+        assert "nonce" not in sim.w3.eth.calls[0]
+
+    def test_revert_fails_and_is_cached(self):
+        sim = simulator(revert=True)
+
+        with pytest.raises(SwapSimulationFailed):
+            sim.finish(sim.start(TRANSACTION, [(TOKEN, 'sell')]))
+
+        # Known bad tokens fail without another call
+        with pytest.raises(SwapSimulationFailed):
+            sim.start(TRANSACTION, [(TOKEN.upper(), 'sell')])
+        assert len(sim.w3.eth.calls) == 1
+
+    def test_verdicts_expire(self):
+        sim = simulator(ttl=0)
+
+        sim.finish(sim.start(TRANSACTION, [(TOKEN, 'buy')]))
+
+        assert sim.cache.get(TOKEN, 'buy') is None
+
+    def test_simulation_runs_concurrently(self):
+        sim = simulator()
+        sim.w3.eth.release.clear()
+
+        simulation = sim.start(TRANSACTION, [(TOKEN, 'buy')])
+
+        # start() returned while the eth_call is still blocked, so signing can proceed
+        assert not simulation.future.done()
+        sim.w3.eth.release.set()
+        sim.finish(simulation)
+
+    def test_infrastructure_errors_do_not_block_trades(self):
+        def timeout(transaction):
+            raise TimeoutError("node timeout")
+
+        sim = simulator()
+        sim.w3.eth.call = timeout
+
+        sim.finish(sim.start(TRANSACTION, [(TOKEN, 'buy')]))
+
+        assert sim.cache.get(TOKEN, 'buy') is None
+
+    def test_rpc_errors_are_not_reverts(self):
+        def rate_limited(transaction):
+            raise ValueError({'code': -32005, 'message': 'limit exceeded'})
+
+        sim = simulator()
+        sim.w3.eth.call = rate_limited
+
+        sim.finish(sim.start(TRANSACTION, [(TOKEN, 'buy')]))
+
+        assert sim.cache.get(TOKEN, 'buy') is None
+
+    def test_node_reverts_are_reverts(self):
+        def reverted(transaction):
+            raise ValueError({'code': -32000, 'message': 'execution reverted: Pancake: K'})
+
+        sim = simulator()
+        sim.w3.eth.call = reverted
+
+        with pytest.raises(SwapSimulationFailed):
+            sim.finish(sim.start(TRANSACTION, [(TOKEN, 'buy')]))
+
+        assert not sim.cache.get(TOKEN, 'buy').ok
+
+    def test_token_to_token_revert_is_not_pinned_on_either_token(self):
+        sim = simulator(revert=True)
+        other = "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d"
+
+        with pytest.raises(SwapSimulationFailed):
+            sim.finish(sim.start(TRANSACTION, [(TOKEN, 'sell'), (other, 'buy')]))
+
+        assert sim.cache.get(TOKEN, 'sell') is None
+        assert sim.cache.get(other, 'buy') is None
@@ -0,0 +1,89 @@
+import json
+import pytest
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Generator
+from network.transport import HttpTransport
+from network.bscscan_client import BscScanClient
+from utils.exceptions import BscScanError
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """
+    Answers every GET with a BscScan style payload over a keep-alive connection
+    """
+    protocol_version = "HTTP/1.1"
+    payload = {"status": "1", "message": "OK", "result": [{"hash": "0x01"}]}
+
+    def do_GET(self):
+        body = json.dumps(self.payload).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server() -> Generator[str, None, None]:
+    """
+    Method that runs a local HTTP server and yields its url
+    """
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestHttpTransport(object):
+
+    def test_session_per_host(self):
+        transport = HttpTransport()
+
+        assert transport.session("https://api.binance.com/a") is transport.session("https://api.binance.com/b")
+        assert transport.session("https://api.binance.com/a") is not transport.session("https://api.bscscan.com/api")
+
+    def test_from_config(self):
+        transport = HttpTransport.from_config({'http_connect_timeout': 1, 'http_read_timeout': 2, 'http_pool_size': 4})
+
+        assert transport.timeout == (1.0, 2.0)
+        assert transport.pool_size == 4
+
+    def test_connections_are_reused(self, server: str):
+        transport = HttpTransport()
+
+        for _ in range(5):
+            assert transport.get(f"{server}/api").status_code == 200
+
+        stats = transport.stats()[server]
+
+        assert stats['requests'] == 5
+        assert stats['connections'] == 1
+        assert stats['reuse_rate'] == pytest.approx(0.8)
+
+    def test_bscscan_client(self, server: str):
+        client = BscScanClient("key", HttpTransport(), url=f"{server}/api")
+
+        assert client.get_bep20_token_transfer_events_by_address("0xabc", sort='desc') == [{"hash": "0x01"}]
+
+    def test_bscscan_client_errors(self, server: str, monkeypatch):
+        monkeypatch.setattr(KeepAliveHandler, "payload", {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"})
+        client = BscScanClient("key", HttpTransport(), url=f"{server}/api")
+
+        with pytest.raises(BscScanError):
+            client.get_bep20_token_transfer_events_by_address("0xabc")
+
+    def test_bscscan_client_empty_history(self, server: str, monkeypatch):
+        monkeypatch.setattr(KeepAliveHandler, "payload", {"status": "0", "message": "No transactions found", "result": []})
+        client = BscScanClient("key", HttpTransport(), url=f"{server}/api")
+
+        assert client.get_bep20_token_transfer_events_by_address("0xabc") == []
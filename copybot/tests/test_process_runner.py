@@ -0,0 +1,62 @@
+import pytest
+import queue
+import threading
+
+from models.trade_order import TradeOrder
+from process_runner import ProcessSupervisor, QueueBot, executor_index
+
+
+TOKEN = "0x0e09fabb73bd3ade0a17ecc321fd13a19e81ce82"
+
+
+def exiting_target(*args):
+    pass
+
+
+class TestProcessRunner(object):
+
+    def test_executor_index_is_stable(self):
+        assert executor_index(TOKEN, 4) == executor_index(TOKEN.upper(), 4)
+        assert 0 <= executor_index(TOKEN, 4) < 4
+
+    def test_queue_bot_routes_by_token(self):
+        queues = [queue.Queue() for _ in range(3)]
+        bot = QueueBot(queues, token_registry=None, transport=None)
+
+        assert bot.process_trade_order(TradeOrder('BUY', 'CAKE', TOKEN, 18))
+
+        data = queues[executor_index(TOKEN, 3)].get_nowait()
+        assert TradeOrder.from_bytes(data).contract_address == TOKEN
+
+    def test_executors_need_wallets(self):
+        with pytest.raises(ValueError):
+            ProcessSupervisor("properties.yml", ["0xleader"], executor_count=2, wallet_count=1)
+
+    def test_leaders_are_split_between_watchers(self):
+        leaders = ["0xa", "0xb", "0xc"]
+
+        assert ProcessSupervisor("properties.yml", leaders, 1, 1).leader_groups == [["0xa"], ["0xb"], ["0xc"]]
+        assert ProcessSupervisor("properties.yml", leaders, 1, 1, watcher_count=1).leader_groups == [leaders]
+        assert ProcessSupervisor("properties.yml", leaders, 1, 1, watcher_count=2).leader_groups == [["0xa", "0xc"], ["0xb"]]
+
+    def test_dead_processes_are_restarted(self):
+        supervisor = ProcessSupervisor("properties.yml", ["0xleader"], 1, 1,
+                                       watcher_target=exiting_target, executor_target=exiting_target)
+        supervisor.start()
+        for process in list(supervisor.watchers.values()) + list(supervisor.executors.values()):
+            process.join(5)
+
+        supervisor.check_processes()
+        supervisor.stop(timeout=5)
+
+        assert supervisor.restarts == 2
+
+    def test_shutdown_request_stops_supervisor(self):
+        supervisor = ProcessSupervisor("properties.yml", ["0xleader"], 1, 1,
+                                       watcher_target=exiting_target, executor_target=exiting_target)
+        threading.Timer(0.5, supervisor.request_shutdown).start()
+
+        supervisor.run_forever(check_interval=0.1)
+
+        assert supervisor.stop_event.is_set()
+        assert not any(process.is_alive() for process in list(supervisor.watchers.values()) + list(supervisor.executors.values()))
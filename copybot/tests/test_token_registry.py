@@ -0,0 +1,98 @@
+import pytest
+
+from token_registry import TokenRegistry
+
+
+TOKEN = "0x1af3f329e8be154074d8769d1ffa4ee058b1dbc3"
+OTHER = "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d"
+OWNER = "0x94e3361495bD110114ac0b6e35Ed75E77E6a6cFA"
+
+
+class FakeFetcher:
+    """
+    Records the batches requested from the chain
+    """
+    def __init__(self):
+        self.batches = []
+
+    def fetch(self, addresses: list) -> dict:
+        self.batches.append(list(addresses))
+        return {
+            address: {'address': address.upper(), 'symbol': 'CHAIN', 'decimals': 9, 'pair_address': '0xpair'}
+            for address in addresses
+        }
+
+
+@pytest.fixture
+def registry(tmp_path) -> TokenRegistry:
+    return TokenRegistry(str(tmp_path / "token_registry.json"), fetcher=FakeFetcher())
+
+
+class TestTokenRegistry(object):
+
+    def test_register_from_payload(self, registry: TokenRegistry):
+        token = registry.register(TOKEN, 'DAI', '18')
+
+        assert token.symbol == 'DAI'
+        assert token.decimals == 18
+        assert registry.get(TOKEN.upper()) is token
+
+    def test_resolve_fetches_missing_tokens_in_one_batch(self, registry: TokenRegistry):
+        registry.register(TOKEN, 'DAI', 18)
+
+        tokens = registry.resolve([TOKEN, OTHER])
+
+        assert registry.fetcher.batches == [[TOKEN, OTHER]]
+        # Values from the payload are kept, chain values only fill gaps
+        assert tokens[TOKEN].symbol == 'DAI'
+        assert tokens[TOKEN].decimals == 18
+        assert tokens[OTHER].decimals == 9
+        assert tokens[OTHER].pair_address == '0xpair'
+
+    def test_resolve_skips_complete_tokens(self, registry: TokenRegistry):
+        registry.resolve([TOKEN])
+        registry.resolve([TOKEN])
+
+        assert len(registry.fetcher.batches) == 1
+
+    def test_round_trip(self, registry: TokenRegistry):
+        registry.resolve([TOKEN])
+        registry.set_approved(TOKEN, OWNER)
+        registry.save()
+
+        reloaded = TokenRegistry(registry.path)
+        token = reloaded.get(TOKEN)
+
+        assert token.decimals == 9
+        assert reloaded.is_approved(TOKEN, OWNER.lower())
+        assert not reloaded.is_approved(OTHER, OWNER)
+
+    def test_save_merges_other_writers(self, registry: TokenRegistry):
+        other = TokenRegistry(registry.path)
+
+        registry.register(TOKEN, 'DAI', 18)
+        registry.set_approved(TOKEN, OWNER)
+        registry.save()
+
+        other.register(OTHER, 'USDC', 18)
+        other.set_approved(TOKEN, OTHER)
+        other.save()
+
+        reloaded = TokenRegistry(registry.path)
+
+        assert reloaded.get(OTHER).symbol == 'USDC'
+        assert reloaded.get(TOKEN).symbol == 'DAI'
+        assert reloaded.is_approved(TOKEN, OWNER)
+        assert reloaded.is_approved(TOKEN, OTHER)
+
+    def test_failed_save_is_retried(self, tmp_path):
+        registry = TokenRegistry(str(tmp_path / "missing" / "token_registry.json"))
+        registry.register(TOKEN, 'DAI', 18)
+
+        with pytest.raises(OSError):
+            registry.save()
+
+        (tmp_path / "missing").mkdir()
+        registry.save()
+
+        assert TokenRegistry(registry.path).get(TOKEN).symbol == 'DAI'
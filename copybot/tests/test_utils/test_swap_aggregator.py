@@ -0,0 +1,81 @@
+import time
+
+from utils.swap_aggregator import aggregate_swaps
+
+
+LEADER = "0x94e3361495bd110114ac0b6e35ed75e77e6a6cfa"
+PAIR = "0x0ed7e52944161450477ee417de9cd3a859b14fd0"
+FEE_WALLET = "0x000000000000000000000000000000000000dead"
+TOKEN = "0x1af3f329e8be154074d8769d1ffa4ee058b1dbc3"
+USDC = "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d"
+
+
+def transfer(txn_hash: str, txn_from: str, txn_to: str, token: str, value: int, symbol: str = 'TKN') -> dict:
+    return {
+        'hash': txn_hash, 'timeStamp': '1620000000', 'from': txn_from, 'to': txn_to,
+        'contractAddress': token, 'value': str(value), 'tokenSymbol': symbol, 'tokenDecimal': '18',
+    }
+
+
+class TestSwapAggregator(object):
+
+    def test_buy_with_bnb(self):
+        events = aggregate_swaps([transfer("0x1", PAIR, LEADER, TOKEN, 100)], LEADER)
+
+        assert len(events) == 1
+        assert events[0].token_in is None
+        assert events[0].token_out == TOKEN
+        assert events[0].amount_out == 100
+        assert events[0].token_out_decimals == 18
+
+    def test_taxed_sell_is_netted(self):
+        transfers = [
+            transfer("0x2", LEADER, PAIR, TOKEN, 90),
+            transfer("0x2", LEADER, FEE_WALLET, TOKEN, 10),
+        ]
+
+        events = aggregate_swaps(transfers, LEADER)
+
+        assert len(events) == 1
+        assert events[0].token_in == TOKEN
+        assert events[0].amount_in == 100
+        assert events[0].token_out is None
+
+    def test_token_to_token_swap(self):
+        transfers = [
+            transfer("0x3", LEADER, PAIR, USDC, 500, 'USDC'),
+            # Router hop between pairs, never touches the leader
+            transfer("0x3", PAIR, FEE_WALLET, USDC, 1),
+            transfer("0x3", PAIR, LEADER, TOKEN, 200),
+        ]
+
+        events = aggregate_swaps(transfers, LEADER)
+
+        assert len(events) == 1
+        assert (events[0].token_in, events[0].amount_in, events[0].token_in_symbol) == (USDC, 500, 'USDC')
+        assert (events[0].token_out, events[0].amount_out) == (TOKEN, 200)
+
+    def test_self_transfer_is_not_a_swap(self):
+        assert aggregate_swaps([transfer("0x4", LEADER, LEADER, TOKEN, 100)], LEADER) == []
+
+    def test_events_keep_page_order_and_case(self):
+        transfers = [
+            transfer("0x5", PAIR, LEADER.upper(), TOKEN, 1),
+            transfer("0x6", LEADER, PAIR, TOKEN, 1),
+            transfer("0x5", PAIR, LEADER, TOKEN, 1),
+        ]
+
+        events = aggregate_swaps(transfers, LEADER.upper())
+
+        assert [event.txn_hash for event in events] == ["0x5", "0x6"]
+        assert events[0].amount_out == 2
+
+    def test_large_page_is_linear(self):
+        transfers = [transfer(f"0x{i // 3:x}", PAIR if i % 3 else LEADER, LEADER if i % 3 else PAIR, TOKEN, 10)
+                     for i in range(300000)]
+
+        start = time.perf_counter()
+        events = aggregate_swaps(transfers, LEADER)
+
+        assert len(events) == 100000
+        assert time.perf_counter() - start < 5
@@ -0,0 +1,27 @@
+import pytest
+
+from warmup import StartupTimer
+
+
+class TestStartupTimer(object):
+
+    def test_records_phases(self):
+        timer = StartupTimer()
+
+        with timer.phase("first"):
+            pass
+        with timer.phase("second"):
+            pass
+
+        assert [name for name, _, _ in timer.phases] == ["first", "second"]
+        assert "first" in timer.report()
+        assert "total" in timer.report()
+
+    def test_records_failed_phase(self):
+        timer = StartupTimer()
+
+        with pytest.raises(ValueError):
+            with timer.phase("broken"):
+                raise ValueError("no connection")
+
+        assert "FAILED: no connection" in timer.report()
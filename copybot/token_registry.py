@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows, saves are not locked between processes
+    fcntl = None
+
+from models.token_info import TokenInfo
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRegistry:
+    """
+    On-disk registry of token metadata shared by CopyBot, BscTrades and
+    Pancakeswap. The whole file is read in one bulk read at startup, missing
+    fields are filled lazily through a batched chain fetcher.
+    """
+    def __init__(self, path: str, fetcher=None):
+        self.path = path
+        self.fetcher = fetcher
+
+        # Lowercase token address -> TokenInfo
+        self.tokens = {}
+
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        self.load()
+
+    @classmethod
+    def from_config(cls, config: dict, path_to_config: str) -> 'TokenRegistry':
+        """
+        Resolves 'token_registry_path' relative to the properties file
+        """
+        path = config.get('token_registry_path') or 'token_registry.json'
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(path_to_config)), path)
+
+        return cls(path)
+
+    def _read(self) -> dict:
+        with open(self.path, 'rb') as f:
+            data = json.loads(f.read())
+
+        return {key: TokenInfo.from_dict(token) for key, token in data.items()}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            logger.info(f"No token registry found at {self.path}, starting empty")
+            return
+
+        self.tokens = self._read()
+        logger.info(f"Loaded {len(self.tokens)} tokens from registry {self.path}")
+
+    def save(self):
+        """
+        Writes the registry if anything changed. Several processes (executors,
+        watchers) may hold a registry on the same file, so the file is locked
+        and what another process saved since is merged in before writing. The
+        data goes to a temp file of our own first so a crash never leaves a
+        truncated registry behind.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+
+        try:
+            self._write()
+        except BaseException:
+            # Keep the changes pending so the next save retries them
+            with self._lock:
+                self._dirty = True
+            raise
+
+    def _write(self):
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            on_disk = self._read() if os.path.exists(self.path) else {}
+
+            with self._lock:
+                for key, token in on_disk.items():
+                    if key in self.tokens:
+                        self.tokens[key].merge(token)
+                    else:
+                        self.tokens[key] = token
+
+                data = {key: token.to_dict() for key, token in self.tokens.items()}
+
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)),
+                                            prefix=f"{os.path.basename(self.path)}.", suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f, indent=1)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+    def get(self, address: str) -> TokenInfo:
+        return self.tokens.get(address.lower())
+
+    def register(self, address: str, symbol: str = None, decimals: int = None) -> TokenInfo:
+        """
+        Records metadata already known to the caller (e.g. from a BscScan
+        payload) without any chain reads
+        """
+        with self._lock:
+            token = self.tokens.get(address.lower())
+            if token is None:
+                token = TokenInfo(address)
+                self.tokens[address.lower()] = token
+                self._dirty = True
+
+            if token.symbol is None and symbol is not None:
+                token.symbol = symbol
+                self._dirty = True
+            if token.decimals is None and decimals is not None:
+                token.decimals = int(decimals)
+                self._dirty = True
+
+        return token
+
+    def resolve(self, addresses: list) -> dict:
+        """
+        Returns TokenInfo for every address, fetching all incomplete entries
+        from the chain in a single batch
+        """
+        for address in addresses:
+            self.register(address)
+
+        missing = [address for address in addresses if not self.get(address).is_complete()]
+        if missing and self.fetcher:
+            fetched = self.fetcher.fetch(missing)
+
+            with self._lock:
+                for address, fields in fetched.items():
+                    token = self.tokens[address.lower()]
+                    # Chain values only fill gaps, except the checksummed address
+                    for field, value in fields.items():
+                        if value is None:
+                            continue
+                        if field == 'address' or getattr(token, field) is None:
+                            setattr(token, field, value)
+                self._dirty = True
+
+        return {address: self.get(address) for address in addresses}
+
+    def is_approved(self, address: str, owner: str) -> bool:
+        token = self.get(address)
+
+        return token is not None and owner.lower() in token.approved_owners
+
+    def set_approved(self, address: str, owner: str):
+        token = self.register(address)
+        with self._lock:
+            if owner.lower() not in token.approved_owners:
+                token.approved_owners.add(owner.lower())
+                self._dirty = True
@@ -9,3 +9,13 @@ class InvalidToken(Exception):
 class InsufficientBalance(Exception):
     def __init__(self, had: int, needed: int) -> None:
         Exception.__init__(self, f"Insufficient balance. Had {had}, needed {needed}")
+
+
+class BscScanError(Exception):
+    def __init__(self, message: str, result: Any) -> None:
+        Exception.__init__(self, f"BscScan API error: {message} ({result})")
+
+
+class SwapSimulationFailed(Exception):
+    def __init__(self, token: Any, side: str, reason: str) -> None:
+        Exception.__init__(self, f"Simulated {side} of {token} failed: {reason}")
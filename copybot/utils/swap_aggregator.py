@@ -0,0 +1,57 @@
+from models.swap_event import SwapEvent
+from utils.trade_rules import leader_net_value
+
+
+def aggregate_swaps(transfers: list, leader_address: str) -> list:
+    """
+    Groups a page of BEP20 transfer events by transaction hash and nets the
+    leader's incoming and outgoing value per token, in a single pass.
+
+    Returns one SwapEvent per transaction in which the leader's balance of
+    some token changed, in order of first appearance. Router hops, WBNB legs
+    and transfer taxes that don't touch the leader are ignored, taxes paid
+    by the leader are netted into what they sent.
+    """
+    leader = leader_address.lower()
+
+    # hash -> [timestamp, {token: [net value, address, symbol, decimals]}]
+    transactions = {}
+
+    for transfer in transfers:
+        txn_to = str(transfer.get('to')).lower()
+        txn_from = str(transfer.get('from')).lower()
+
+        if leader not in (txn_to, txn_from):
+            continue
+
+        net = leader_net_value(int(transfer.get('value')), txn_from, txn_to, leader)
+
+        txn_hash = str(transfer.get('hash'))
+        transaction = transactions.get(txn_hash)
+        if transaction is None:
+            transaction = transactions[txn_hash] = [int(transfer.get('timeStamp')), {}]
+
+        contract_address = str(transfer.get('contractAddress'))
+        token = transaction[1].get(contract_address.lower())
+        if token is None:
+            transaction[1][contract_address.lower()] = [net, contract_address, transfer.get('tokenSymbol'), transfer.get('tokenDecimal')]
+        else:
+            token[0] += net
+
+    events = []
+    for txn_hash, (timestamp, tokens) in transactions.items():
+        event = SwapEvent(txn_hash, timestamp)
+
+        # Keep the first token the leader received and the first they sent
+        for net, address, symbol, decimals in tokens.values():
+            if net > 0 and event.token_out is None:
+                event.token_out, event.amount_out = address, net
+                event.token_out_symbol, event.token_out_decimals = symbol, int(decimals)
+            elif net < 0 and event.token_in is None:
+                event.token_in, event.amount_in = address, -net
+                event.token_in_symbol, event.token_in_decimals = symbol, int(decimals)
+
+        if event.token_in is not None or event.token_out is not None:
+            events.append(event)
+
+    return events
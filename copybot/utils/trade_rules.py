@@ -0,0 +1,24 @@
+"""
+Copy trading rules shared by the live watcher (BscTrades) and the backtester,
+so both make the same BUY/SELL decisions.
+"""
+
+# Percentage of the leader's position that must be sold before we sell ours
+SELL_THRESHOLD_PERCENT = 50
+
+
+def leader_net_value(value, txn_from, txn_to, leader_address):
+    """
+    Change of the leader's balance from one transfer: positive when they
+    received, negative when they sent. Takes scalars, or numpy arrays of
+    lowercase addresses for the backtester.
+    """
+    return (txn_to == leader_address) * value - (txn_from == leader_address) * value
+
+
+def sell_percentage(sold_value: int, bought_value: int) -> int:
+    return int((int(sold_value) / bought_value) * 100)
+
+
+def meets_sell_threshold(sold_value: int, bought_value: int) -> bool:
+    return sell_percentage(sold_value, bought_value) >= SELL_THRESHOLD_PERCENT
@@ -0,0 +1,83 @@
+import logging
+import time
+
+from contextlib import contextmanager
+
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Records how long each startup phase takes
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        error = None
+
+        try:
+            yield
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.phases.append((name, time.perf_counter() - start, error))
+
+    def report(self) -> str:
+        lines = ["Startup time report:"]
+
+        for name, elapsed, error in self.phases:
+            status = f" FAILED: {error}" if error else ""
+            lines.append(f"  {name:<24} {elapsed * 1000:>9.1f} ms{status}")
+
+        lines.append(f"  {'total':<24} {(time.perf_counter() - self.started) * 1000:>9.1f} ms")
+
+        return "\n".join(lines)
+
+
+class WarmUp:
+    """
+    Pays the one-off costs of the first trade before polling starts:
+    connections, contract loads, nonces, price cache and approval checks.
+    A failing step is logged and skipped, the trade path will retry it lazily.
+    """
+    def __init__(self, bot, bsc_trades, timer: StartupTimer):
+        self.bot = bot
+        self.bsc_trades = bsc_trades
+        self.timer = timer
+
+    def _step(self, name: str, function):
+        try:
+            with self.timer.phase(name):
+                return function()
+        except Exception as e:
+            logger.warning(f"Warm-up step '{name}' failed: {e}")
+
+    def run(self):
+        self._step("rpc connect", lambda: self.bot.get_web3().eth.block_number)
+        self._step("contracts and nonces", self._load_lanes)
+        self._step("bscscan connect", lambda: self.bsc_trades.get_account_transactions(self.bsc_trades.connect(), self.bsc_trades.address))
+        self._step("price cache", self.bot.get_bnb_price)
+        self._step("token metadata", lambda: self.bot.token_registry.resolve([token.address for token in self.bot.token_registry.tokens.values()]))
+        self._step("approval checks", self.bot.precheck_approvals)
+        self._step("open tokens", self.bot.restore_open_tokens)
+
+        self.bot.save_token_registry()
+
+    def _load_lanes(self):
+        """
+        Creates each lane's Pancakeswap client, which loads the router and
+        factory contracts and fetches the lane's nonce, and primes its balance
+        """
+        max_slippage = float(self.bot.config.get('max_slippage'))
+
+        for lane in self.bot.lane_pool.lanes:
+            pancakeswap = self.bot.get_pancakeswap(lane.address, lane.private_key, max_slippage, lane)
+
+            lane.last_nonce = max(lane.last_nonce, pancakeswap.last_nonce)
+            lane.bnb_balance = pancakeswap.get_eth_balance() / 10 ** 18